@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+#
+# Compare retrieving Jira issues one request per issue against batched searches.
+#
+# A local stub server mimicking Jira's issue and search endpoints delays every
+# response. The per-issue path requests /issue/{key} for every ID as the get
+# command previously did while the batched path uses `key in (...)` searches
+# of up to the maximum page size sent in parallel.
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+from bite.service._reqs import Request
+from bite.service._rest import RESTRequest
+from bite.service.jira import Jira
+
+
+def issue(key):
+    user = {'name': 'jsmith', 'displayName': 'John Smith'}
+    return {
+        'id': key.split('-')[1], 'key': key,
+        'fields': {
+            'summary': 'issue summary', 'description': 'x' * 300,
+            'status': {'name': 'Open'}, 'priority': {'name': 'Major'},
+            'assignee': user, 'reporter': user, 'creator': user,
+            'created': '2019-01-01T00:00:00.000+0000', 'updated': '2019-01-02T00:00:00.000+0000',
+            'watches': {'watchCount': 3}, 'votes': {'votes': 0},
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0
+    # maximum number of issues returned per search page
+    max_size = 1000
+
+    def do_GET(self):
+        key = self.path.split('?')[0].rsplit('/', 1)[1]
+        self._respond(issue(key))
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        keys = re.match(r'key in \((.*)\)', data['jql']).group(1).split(',')
+        start = data.get('startAt', 0)
+        size = min(data['maxResults'], self.max_size)
+        self._respond({
+            'startAt': start, 'maxResults': size, 'total': len(keys),
+            'issues': [issue(x) for x in keys[start:start + size]],
+        })
+
+    def _respond(self, data):
+        time.sleep(self.delay)
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PerIssueRequest(Request):
+    """Request every issue separately."""
+
+    def __init__(self, ids, **kw):
+        super().__init__(**kw)
+        params = {'expand': [], 'fields': ['*all', '-comment', '-changelog', '-attachment']}
+        self._reqs = tuple(
+            RESTRequest(
+                service=self.service, endpoint=f'/issue/{self.service._issue_key(i)}',
+                params=params)
+            for i in ids)
+
+    def parse(self, data):
+        for x in data:
+            yield self.service.item(id=x['key'].split('-')[1], **x['fields'])
+
+
+def run(req):
+    start = time.perf_counter()
+    results = list(req.send())
+    elapsed = time.perf_counter() - start
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark Jira issue retrieval')
+    parser.add_argument(
+        '-n', '--issues', type=int, nargs='+', default=[10, 100, 1000],
+        help='number of issues to retrieve per run')
+    parser.add_argument(
+        '-C', '--concurrent', type=int, default=None,
+        help='maximum number of concurrent requests')
+    parser.add_argument(
+        '--page-size', type=int, default=1000,
+        help='maximum number of issues the server returns per search page')
+    parser.add_argument(
+        '--delay', type=float, default=0.02,
+        help='server response delay in seconds')
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    StubHandler.max_size = args.page_size
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}/projects/PROJ'
+
+    print(f"{'method':<10} {'issues':>8} {'seconds':>9} {'issues/s':>9} {'speedup':>8}")
+    for count in args.issues:
+        ids = [str(i) for i in range(1, count + 1)]
+        service = Jira(base=base, concurrent=args.concurrent, http_cache=False)
+        baseline, results = run(PerIssueRequest(ids, service=service))
+        assert [x.id for x in results] == ids
+        print(f"{'per-issue':<10} {count:>8} {baseline:>9.3f} {count / baseline:>9.1f} {1:>7.1f}x")
+
+        service = Jira(base=base, concurrent=args.concurrent, http_cache=False)
+        req = service.GetRequest(ids=ids, get_comments=False, get_attachments=False)
+        elapsed, results = run(req)
+        assert [x.id for x in results] == ids
+        print(f"{'batched':<10} {count:>8} {elapsed:>9.3f} {count / elapsed:>9.1f} {baseline / elapsed:>7.1f}x")
+
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+#
+# Compare JSON codec performance decoding responses and encoding requests.
+#
+# Decoding is measured from raw response content against the previous method
+# of decoding via requests' Response.json() which first converts the content to
+# a string. By default synthetic payloads shaped like Bugzilla and Jira REST
+# responses are used, recorded responses can be passed as arguments instead.
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+from bite.service._json import JSON_CODECS
+
+
+def bugzilla(count):
+    """Generate a Bugzilla REST bug search response."""
+    bug = {
+        'id': 0, 'summary': 'crash on startup with ünïcode locale',
+        'status': 'CONFIRMED', 'resolution': '', 'product': 'Core', 'component': 'General',
+        'assigned_to': 'nobody@example.com', 'creator': 'user@example.com',
+        'creation_time': '2019-01-01T00:00:00Z', 'last_change_time': '2019-01-02T00:00:00Z',
+        'cc': [f'user{i}@example.com' for i in range(10)], 'keywords': ['crash', 'regression'],
+        'flags': [{'id': 1, 'name': 'needinfo', 'status': '?', 'setter': 'user@example.com'}],
+        'is_open': True, 'priority': 'P3', 'severity': 'normal', 'votes': 0,
+    }
+    return {'bugs': [{**bug, 'id': i} for i in range(count)]}
+
+
+def jira(count):
+    """Generate a Jira REST issue search response."""
+    user = {'name': 'jsmith', 'displayName': 'John Smith', 'active': True, 'timeZone': 'UTC'}
+    issue = {
+        'id': '0', 'key': 'PROJ-0', 'self': 'https://jira.example.com/rest/api/2/issue/0',
+        'fields': {
+            'summary': 'issue summary', 'description': 'x' * 300,
+            'status': {'id': '1', 'name': 'Open', 'statusCategory': {'id': 2, 'key': 'new'}},
+            'priority': {'id': '3', 'name': 'Major'}, 'labels': ['backend', 'ui'],
+            'assignee': user, 'reporter': user, 'creator': user,
+            'created': '2019-01-01T00:00:00.000+0000', 'updated': '2019-01-02T00:00:00.000+0000',
+            'watches': {'watchCount': 3, 'isWatching': False}, 'customfield_10000': None,
+        },
+    }
+    issues = [{**issue, 'id': str(i), 'key': f'PROJ-{i}'} for i in range(count)]
+    return {'startAt': 0, 'maxResults': count, 'total': count, 'issues': issues}
+
+
+def response(content):
+    r = requests.Response()
+    r.status_code = 200
+    r.headers['Content-Type'] = 'application/json'
+    r._content = content
+    r._content_consumed = True
+    return r
+
+
+def bench(func, number):
+    """Best average runtime of a function in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark JSON codecs')
+    parser.add_argument(
+        'files', nargs='*', help='recorded JSON responses (defaults to synthetic payloads)')
+    parser.add_argument(
+        '-c', '--count', type=int, default=1000,
+        help='number of items in the synthetic payloads')
+    parser.add_argument('-n', '--number', type=int, default=20, help='iterations per run')
+    args = parser.parse_args()
+
+    if args.files:
+        payloads = []
+        for path in args.files:
+            with open(path, 'rb') as f:
+                payloads.append((os.path.basename(path), f.read()))
+    else:
+        payloads = [
+            ('bugzilla', json.dumps(bugzilla(args.count)).encode()),
+            ('jira', json.dumps(jira(args.count)).encode()),
+        ]
+    codecs = [codec for codec, module in JSON_CODECS.values() if module is not None]
+
+    print(f"{'payload':<12} {'size':>8} {'method':<16} {'decode (ms)':>12} {'speedup':>8}")
+    for name, content in payloads:
+        r = response(content)
+        baseline = bench(r.json, args.number)
+        size = f'{len(content) / 1024:.0f}KB'
+        print(f"{name:<12} {size:>8} {'Response.json':<16} {baseline * 1000:>12.2f} {1:>7.1f}x")
+        for codec in codecs:
+            elapsed = bench(lambda: codec.loads(r.content), args.number)
+            print(f"{'':<12} {'':>8} {codec.name:<16} {elapsed * 1000:>12.2f} {baseline / elapsed:>7.1f}x")
+
+    # encode a JSON-RPC bug request for a large number of IDs
+    data = {'method': 'Bug.get', 'params': [{'ids': list(range(10000))}], 'id': 0}
+    print(f"\n{'request':<12} {'':>8} {'method':<16} {'encode (ms)':>12} {'speedup':>8}")
+    baseline = bench(lambda: json.dumps(data), args.number)
+    print(f"{'Bug.get':<12} {'':>8} {'json.dumps':<16} {baseline * 1000:>12.2f} {1:>7.1f}x")
+    for codec in codecs:
+        elapsed = bench(lambda: codec.dumps(data), args.number)
+        print(f"{'':<12} {'':>8} {codec.name:<16} {elapsed * 1000:>12.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# Compare peak memory use of regular and streamed JSON response parsing.
+#
+# A local HTTP server returns a large synthetic search response and each
+# parsing mode is run in a separate process, reporting the time to the first
+# parsed item, the total parsing time, and the peak resident set size of the
+# process.
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+from bite.service._jsonrest import JsonREST
+from bite.service._rest import RESTRequest
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    body = b''
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        chunk_size = 1024 * 1024
+        for i in range(0, len(self.body), chunk_size):
+            self.wfile.write(self.body[i:i + chunk_size])
+
+    def log_message(self, *args):
+        pass
+
+
+class SearchRequest(RESTRequest):
+
+    _stream = ('bugs',)
+
+    def __init__(self, **kw):
+        super().__init__(endpoint='/search', **kw)
+
+    def parse(self, data):
+        for bug in data['bugs']:
+            yield bug['id']
+
+
+def response(size):
+    """Generate a synthetic search response of roughly the given size in bytes."""
+    summary = 'x' * 400
+    bug = {
+        'id': 0, 'summary': summary, 'status': 'CONFIRMED', 'assigned_to': 'nobody@example.com',
+        'cc': [f'user{i}@example.com' for i in range(10)], 'keywords': ['crash', 'regression'],
+    }
+    count = size // len(json.dumps(bug))
+    bugs = ({**bug, 'id': i} for i in range(count))
+    return ('{"bugs": [' + ', '.join(map(json.dumps, bugs)) + '], "total": %i}' % count).encode()
+
+
+def run(base, stream):
+    service = JsonREST(base=base, stream=stream, http_cache=False)
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in service.send(SearchRequest(service=service)):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'count': count, 'first': first, 'elapsed': elapsed, 'peak': peak_rss()}))
+
+
+def peak_rss():
+    """Peak resident set size of the current process in KB."""
+    # ru_maxrss includes the memory of the parent process before exec on Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark streamed JSON parsing')
+    parser.add_argument(
+        '-s', '--size', type=int, default=100,
+        help='size of the generated response in MB')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--stream', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args.stream)
+        return
+
+    StubHandler.body = response(args.size * 1024 * 1024)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+
+    print(f'response size: {len(StubHandler.body) / 1024 / 1024:.1f}MB')
+    print(f"{'mode':<10} {'items':>8} {'first (s)':>10} {'total (s)':>10} {'peak RSS':>10}")
+    for stream in (False, True):
+        cmd = [sys.executable, __file__, '--run', base]
+        if stream:
+            cmd.append('--stream')
+        output = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+        results = json.loads(output)
+        mode = 'streamed' if stream else 'regular'
+        print(
+            f"{mode:<10} {results['count']:>8} {results['first']:>10.3f} "
+            f"{results['elapsed']:>10.3f} {results['peak'] / 1024:>8.1f}MB")
+
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+#
+# Compare the throughput and peak memory use of XML and JSON response parsing.
+#
+# The same synthetic Redmine issue list is rendered in both formats, mirroring
+# the output of Redmine's REST API, and each parsing mode is run in a separate
+# process reporting the parsing time and the peak resident set size of the
+# process.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src'))
+
+from bite.service._jsonrest import JsonREST
+from bite.service._xmlrest import XmlREST
+
+
+MODES = {
+    'json': (JsonREST, 'application/json', False),
+    'json-stream': (JsonREST, 'application/json', True),
+    'xml': (XmlREST, 'application/xml', False),
+    'xml-stream': (XmlREST, 'application/xml', True),
+}
+
+
+def issue(i):
+    """Generate a synthetic Redmine issue."""
+    return {
+        'id': i,
+        'project': {'id': 1, 'name': 'Redmine'},
+        'tracker': {'id': 1, 'name': 'Defect'},
+        'status': {'id': 1, 'name': 'New'},
+        'priority': {'id': 4, 'name': 'Normal'},
+        'author': {'id': 10106, 'name': 'John Smith'},
+        'subject': f'issue {i} subject',
+        'description': 'x' * 400,
+        'done_ratio': 0,
+        'custom_fields': [
+            {'id': 1, 'name': 'Resolution', 'value': 'Duplicate'},
+            {'id': 2, 'name': 'Affected version', 'value': '4.0.0'},
+        ],
+        'created_on': '2019-01-01T00:00:00Z',
+        'updated_on': '2019-01-02T00:00:00Z',
+    }
+
+
+def issue_xml(issue):
+    """Render an issue the way Redmine's XML API does."""
+    lines = ['<issue>']
+    for k, v in issue.items():
+        if k == 'custom_fields':
+            lines.append('<custom_fields type="array">')
+            for field in v:
+                lines.append(
+                    f'<custom_field id="{field["id"]}" name={quoteattr(field["name"])}>'
+                    f'{escape(field["value"])}</custom_field>')
+            lines.append('</custom_fields>')
+        elif isinstance(v, dict):
+            lines.append(f'<{k} id="{v["id"]}" name={quoteattr(v["name"])}/>')
+        else:
+            lines.append(f'<{k}>{escape(str(v))}</{k}>')
+    lines.append('</issue>')
+    return '\n'.join(lines)
+
+
+def responses(size):
+    """Generate JSON and XML issue lists of roughly the given size in bytes."""
+    count = size // len(issue_xml(issue(0)))
+    issues = [issue(i) for i in range(count)]
+    attrs = {'total_count': count, 'offset': 0, 'limit': count}
+    data = json.dumps({'issues': issues, **attrs}).encode()
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<issues total_count="{count}" offset="0" limit="{count}" type="array">\n' +
+        '\n'.join(map(issue_xml, issues)) +
+        '\n</issues>').encode()
+    return data, xml
+
+
+def run(mode, path):
+    service_cls, content_type, stream = MODES[mode]
+    service = service_cls(base='http://127.0.0.1', stream=stream, http_cache=False)
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    with open(path, 'rb') as f:
+        response._content = f.read()
+    response._content_consumed = True
+
+    start = time.perf_counter()
+    data = service.parse_response(response, stream=('issues',) if stream else None)
+    count = sum(1 for _ in data['issues'])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'count': count, 'elapsed': elapsed, 'peak': peak_rss()}))
+
+
+def peak_rss():
+    """Peak resident set size of the current process in KB."""
+    # ru_maxrss includes the memory of the parent process before exec on Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark XML and JSON response parsing')
+    parser.add_argument(
+        '-s', '--size', type=int, default=50,
+        help='size of the generated XML response in MB')
+    parser.add_argument('--run', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(*args.run)
+        return
+
+    try:
+        import ijson
+        modes = tuple(MODES)
+    except ImportError:
+        modes = tuple(x for x in MODES if x != 'json-stream')
+
+    data, xml = responses(args.size * 1024 * 1024)
+    print(f'JSON size: {len(data) / 1024 / 1024:.1f}MB, XML size: {len(xml) / 1024 / 1024:.1f}MB')
+    print(f"{'mode':<12} {'items':>8} {'total (s)':>10} {'MB/s':>8} {'items/s':>10} {'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {}
+        for fmt, content in (('json', data), ('xml', xml)):
+            paths[fmt] = os.path.join(tmpdir, f'issues.{fmt}')
+            with open(paths[fmt], 'wb') as f:
+                f.write(content)
+
+        for mode in modes:
+            fmt = mode.split('-')[0]
+            cmd = [sys.executable, __file__, '--run', mode, paths[fmt]]
+            output = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+            results = json.loads(output)
+            size = os.path.getsize(paths[fmt]) / 1024 / 1024
+            print(
+                f"{mode:<12} {results['count']:>8} {results['elapsed']:>10.3f} "
+                f"{size / results['elapsed']:>8.1f} {results['count'] / results['elapsed']:>10.0f} "
+                f"{results['peak'] / 1024:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
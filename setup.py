@@ -109,6 +109,12 @@ setup(
         pkgdist.data_mapping(CONFIG_INSTALL_OFFSET, 'config'),
         pkgdist.data_mapping(os.path.join(DATA_INSTALL_OFFSET, 'services'), 'services'),
     )),
+    extras_require={
+        # incrementally parse streamed JSON responses
+        'stream': ['ijson'],
+        # faster JSON decoding via --json-codec=orjson
+        'orjson': ['orjson'],
+    },
     cmdclass=dict(
         pkgdist_cmds,
         install=install,
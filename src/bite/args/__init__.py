@@ -93,11 +93,20 @@ class ServiceOpts(object, metaclass=_RegisterSubcmds):
     _config_map = {
         'skip_auth': str2bool,
         'verify': str2bool,
+        'adaptive': str2bool,
+        'http_cache': str2bool,
+        'http_cache_size': int,
+        'stream': str2bool,
         'quiet': str2bool,
         'columns': lambda x: setattr(const, 'COLUMNS', int(x)),
         'concurrent': int,
         'timeout': int,
+        'max_attempts': int,
+        'retry_budget': float,
+        'deadline': float,
         'max_results': int,
+        'prefetch': int,
+        'window': int,
     }
 
     def __init__(self, parser, service_name):
@@ -246,6 +255,9 @@ class Get(ReceiveSubcmd):
         self.opts.add_argument(
             '-C', '--no-comments', action='store_false', dest='get_comments',
             help='do not show comments')
+        self.opts.add_argument(
+            '--unordered', action='store_true',
+            help='output results for each ID as they complete rather than in order')
         if history:
             self.opts.add_argument(
                 '-H', '--show-history', action='store_true', dest='get_changes',
@@ -292,6 +304,9 @@ class Attachments(Subcmd):
         self.opts.add_argument(
             '--save-to',
             help='save attachment(s) into a specified dir')
+        self.opts.add_argument(
+            '--unordered', action='store_true',
+            help='output results for each ID as they complete rather than in order')
 
 
 class Changes(ReceiveSubcmd):
@@ -319,6 +334,9 @@ class Changes(ReceiveSubcmd):
             '-r', '--creator',
             type='str_list', action='parse_stdin',
             help='restrict by person who made the change')
+        self.opts.add_argument(
+            '--unordered', action='store_true',
+            help='output results for each ID as they complete rather than in order')
 
 
 class Comments(ReceiveSubcmd):
@@ -353,6 +371,9 @@ class Comments(ReceiveSubcmd):
             '-m', '--modified', nargs='?', const='/now',
             type='time interval', metavar='TIME_INTERVAL',
             help='comments modified within a specified time interval')
+        self.opts.add_argument(
+            '--unordered', action='store_true',
+            help='output results for each ID as they complete rather than in order')
 
 
 class Attach(SendSubcmd):
@@ -404,6 +404,14 @@ class Search(args.PagedSearch, Bugzilla4_4Opts):
             action='parse_stdin',
             help='restrict by url (one or more)')
 
+        self.offline = self.parser.add_argument_group('Offline related')
+        self.offline.add_argument(
+            '--offline', action='store_true',
+            help=f'search {self.service.item.type}s in the local store')
+        self.offline.add_argument(
+            '--text', metavar='QUERY',
+            help='full-text query to match against comments in the local store')
+
 
 class Search5_0(Search, Bugzilla5_0Opts):
 
@@ -646,3 +654,18 @@ class Fields(args.Subcmd, Bugzilla4_4Opts):
             'fields', nargs='?', default=None,
             type='str_list', action='parse_stdin',
             help='either ID or name')
+
+
+class Sync(args.Subcmd, Bugzilla4_4Opts):
+    """sync bugs to a local store"""
+
+    _name = 'sync'
+
+    def add_args(self):
+        super().add_args()
+        self.opts.add_argument(
+            '-s', '--since', type='date', metavar='TIME',
+            help='sync bugs modified since a given time (required for the initial sync)')
+        self.opts.add_argument(
+            '-b', '--batch', type=int, default=100, metavar='SIZE',
+            help='number of bugs to fetch and store per transaction (default: 100)')
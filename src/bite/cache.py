@@ -1,7 +1,12 @@
 import configparser
+import hashlib
 from http.cookiejar import LWPCookieJar
+import json
 import os
+import shutil
 import stat
+import tempfile
+import threading
 
 from snakeoil.demandload import demandload
 
@@ -201,6 +206,134 @@ class Auth(object):
         return len(self.token)
 
 
+class HttpCache(object):
+    """On-disk cache of HTTP responses for a connection.
+
+    Each entry is stored in a separate file consisting of a line of JSON
+    metadata followed by the response body. Entries are evicted in least
+    recently used order once the cache grows larger than its maximum size.
+    """
+
+    def __init__(self, connection, max_size=None):
+        if connection is not None:
+            self.path = os.path.join(const.USER_CACHE_PATH, 'http', connection)
+        else:
+            self.path = None
+        # default to a maximum size of 100MB
+        self.max_size = max_size if max_size is not None else 100 * 1024 * 1024
+        # tracked cache size, determined on first write
+        self._size = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*args):
+        """Generate an entry key from the given identifying data."""
+        return hashlib.sha256('\0'.join(map(str, args)).encode()).hexdigest()
+
+    def get(self, key):
+        """Get the metadata and body for a given key if it exists."""
+        if self.path is None:
+            return None
+        path = os.path.join(self.path, key)
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline().decode())
+                body = f.read()
+            # update access time for LRU eviction
+            os.utime(path)
+        except (IOError, ValueError):
+            return None
+        return meta, body
+
+    def set(self, key, meta, body):
+        """Store the metadata and body for a given key."""
+        if self.path is None:
+            return
+        data = json.dumps(meta).encode() + b'\n' + body
+        if len(data) > self.max_size:
+            return
+
+        path = os.path.join(self.path, key)
+        tmp_path = None
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            try:
+                old_size = os.path.getsize(path)
+            except FileNotFoundError:
+                old_size = 0
+            # write to a temporary file first so readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            # don't leave partially written entries behind
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except IOError:
+                    pass
+            raise BiteError(f'failed writing HTTP cache: {self.path!r}: {e.strerror}')
+
+        with self._lock:
+            if self._size is None:
+                self._size = self.size
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_size:
+                self._size = self.prune()
+
+    def entries(self):
+        """Iterate over cache entries as (key, size, access time) tuples."""
+        if self.path is None:
+            return
+        try:
+            files = os.scandir(self.path)
+        except FileNotFoundError:
+            return
+        for entry in files:
+            if entry.is_file() and not entry.name.startswith('.'):
+                st = entry.stat()
+                yield entry.name, st.st_size, st.st_mtime
+
+    def __len__(self):
+        return sum(1 for _ in self.entries())
+
+    @property
+    def size(self):
+        """Total size of all cache entries in bytes."""
+        return sum(size for _, size, _ in self.entries())
+
+    def prune(self, max_size=None):
+        """Remove least recently used entries until the cache fits its maximum size.
+
+        Returns the resulting size of the cache in bytes.
+        """
+        max_size = max_size if max_size is not None else self.max_size
+        entries = sorted(self.entries(), key=lambda x: x[2])
+        size = sum(x[1] for x in entries)
+        for key, entry_size, _ in entries:
+            if size <= max_size:
+                break
+            try:
+                os.remove(os.path.join(self.path, key))
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        return size
+
+    def remove(self):
+        """Remove all cache entries."""
+        if self.path is not None:
+            try:
+                shutil.rmtree(self.path)
+            except FileNotFoundError:
+                pass
+            except IOError as e:
+                raise BiteError(f'unable to remove cache: {self.path!r}: {e.strerror}')
+        self._size = None
+
+
 class Cookies(LWPCookieJar):
 
     def __init__(self, connection):
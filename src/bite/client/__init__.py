@@ -151,7 +151,7 @@ class Cli(Client):
 
     @dry_run
     @login_retry
-    def get(self, ids, browser=False, output_url=False, **kw):
+    def get(self, ids, browser=False, output_url=False, unordered=False, **kw):
         """Get item(s) from a service and all related info."""
         if not ids:
             raise RuntimeError(f'No {self.service.item.type} ID(s) specified')
@@ -164,10 +164,11 @@ class Cli(Client):
         elif output_url:
             print(*self.service.item_urls(ids), sep='\n')
         else:
-            request = self.service.GetRequest(ids=ids, **kw)
             self.log_t(f"Getting {self.service.item.type}{pluralism(ids)}: {', '.join(map(str, ids))}")
-
-            data = request.send()
+            if unordered:
+                data = self._send_unordered(self.service.GetRequest, ids, **kw)
+            else:
+                data = self.service.GetRequest(ids=ids, **kw).send()
             lines = chain.from_iterable(self._render_item(item, **kw) for item in data)
             print(*lines, sep='\n')
 
@@ -184,7 +185,7 @@ class Cli(Client):
     @dry_run
     @login_retry
     def attachments(self, ids, id_map=False, item_id=False, output_url=False,
-                    browser=False, **kw):
+                    browser=False, unordered=False, **kw):
         """Get attachments from a service."""
         # skip pulling data if we don't need it
         get_data = (not output_url and not browser)
@@ -201,11 +202,11 @@ class Cli(Client):
             display_ids = ids
 
         if item_id:
-            request = self.service.AttachmentsRequest(ids=ids, get_data=get_data)
+            ids_key = 'ids'
             item_str = f' from {self.service.item.type}'
             plural = '(s)'
         else:
-            request = self.service.AttachmentsRequest(attachment_ids=ids, get_data=get_data)
+            ids_key = 'attachment_ids'
             item_str = ''
             plural = pluralism(display_ids)
 
@@ -223,7 +224,12 @@ class Cli(Client):
             elif browser:
                 _launch_browser(ids)
         else:
-            attachments = request.send()
+            if unordered:
+                attachments = self._send_unordered(
+                    self.service.AttachmentsRequest, ids, ids_key=ids_key, get_data=get_data)
+            else:
+                attachments = self.service.AttachmentsRequest(
+                    get_data=get_data, **{ids_key: ids}).send()
 
             # Attachment requests yield lists of attachments -- each list
             # corresponds to the attachments for given item ID or a single list
@@ -347,7 +353,10 @@ class Cli(Client):
         self.log_t(request.options, prefix='   - ')
 
         data = request.send()
+        self._print_search(data, **kw)
 
+    def _print_search(self, data, **kw):
+        """Output rendered search results."""
         lines = self._render_search(data, **kw)
         count = 0
         for line in lines:
@@ -409,13 +418,26 @@ class Cli(Client):
             else:
                 yield line[:const.COLUMNS]
 
-    def cache(self, *args, update=False, remove=False, **kw):
+    def cache(self, *args, update=False, remove=False, info=False, prune=None, **kw):
         if update:
             updates = self.service.cache_updates
             if updates != self.service.cache:
                 self.service.cache.write(updates=updates)
         elif remove:
             self.service.cache.remove()
+            self.service.http_cache.remove()
+        elif info:
+            http_cache = self.service.http_cache
+            print(f'{self.service.connection}:')
+            print(f'  config: {self.service.cache.path}')
+            print(f'  http: {http_cache.path}')
+            print(f'    entries: {len(http_cache)}')
+            print(f'    size: {http_cache.size / 1024 / 1024:.1f}MB '
+                  f'(max: {http_cache.max_size / 1024 / 1024:.1f}MB)')
+        elif prune is not None:
+            max_size = prune * 1024 * 1024 if prune >= 0 else None
+            size = self.service.http_cache.prune(max_size=max_size)
+            self.log(f'{self.service.connection}: pruned HTTP cache to {size / 1024 / 1024:.1f}MB')
 
     def _render_modifications(self, data, **kw):
         raise NotImplementedError
@@ -485,29 +507,42 @@ class Cli(Client):
 
     @dry_run
     @login_retry
-    def changes(self, **kw):
+    def changes(self, unordered=False, **kw):
         request = self.service.ChangesRequest(item_id=True, filtered=True, **kw)
 
         self.log('Getting changes matching the following options:')
         self.log_t(request.options, prefix='   - ')
 
-        data = request.send()
+        if unordered:
+            data = self._send_unordered(
+                self.service.ChangesRequest, item_id=True, filtered=True, **kw)
+        else:
+            data = request.send()
         lines = self._render_events(data, **kw)
         print(*lines, sep='\n')
 
     @dry_run
     @login_retry
-    def comments(self, **kw):
+    def comments(self, unordered=False, **kw):
         """Get comments from a service."""
         request = self.service.CommentsRequest(item_id=True, filtered=True, **kw)
 
         self.log('Getting comments matching the following options:')
         self.log_t(request.options, prefix='   - ')
 
-        data = request.send()
+        if unordered:
+            data = self._send_unordered(
+                self.service.CommentsRequest, item_id=True, filtered=True, **kw)
+        else:
+            data = request.send()
         lines = self._render_events(data, **kw)
         print(*lines, sep='\n')
 
+    def _send_unordered(self, request_func, ids, ids_key='ids', **kw):
+        """Send a separate request for each ID, yielding results as they complete."""
+        reqs = (request_func(**{ids_key: [x]}, **kw) for x in ids)
+        return chain.from_iterable(self.service.send_unordered(reqs))
+
     def _render_events(self, data, fields=None, output=None, **kw):
         if fields and output is None:
             output = ' '.join(['{}' for x in fields])
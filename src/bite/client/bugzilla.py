@@ -12,9 +12,12 @@ from ..exceptions import BiteError
 from ..utils import block_edit, get_input, launch_browser
 
 demandload(
+    'datetime:datetime',
     'pprint',
     'urllib.parse:parse_qs',
     'bite:const',
+    'bite.objects:DateTime,TimeInterval',
+    'bite.store:ItemStore',
 )
 
 
@@ -235,6 +238,92 @@ class Bugzilla(Cli):
 
         self.print_products(data)
 
+    # search options applicable to offline searches, other options are remote filters
+    _offline_search_opts = frozenset(('terms', 'limit', 'fields', 'output', 'verbosity'))
+
+    def search(self, offline=False, text=None, **kw):
+        """Search for bugs on the service or in the local store."""
+        if not offline:
+            if text is not None:
+                raise BiteError('full-text queries require --offline')
+            return super().search(**kw)
+
+        # offline searches never send requests
+        kw.pop('dry_run', None)
+        unsupported = sorted(k for k in kw if k not in self._offline_search_opts)
+        if unsupported:
+            raise BiteError(
+                f"unsupported offline search option{pluralism(unsupported)}: "
+                f"{', '.join(unsupported)}")
+
+        data = self._search_store(text, **kw)
+        self._print_search(data, **kw)
+
+    def _search_store(self, text, terms=None, limit=None, **kw):
+        """Search for bugs with matching comments in the local store."""
+        if text is None and terms:
+            text = ' '.join(terms)
+        if not text:
+            raise BiteError('no offline search query specified')
+
+        store = ItemStore(self.service.connection)
+        self.log(f'Searching for bugs in {store.path!r} with comments matching: {text!r}')
+        try:
+            for data in store.search(text, limit=limit):
+                # restore stored bugs without reparsing their raw service data
+                bug = self.service.item.__new__(self.service.item)
+                bug.__dict__.update(data, service=self.service)
+                yield bug
+        finally:
+            store.close()
+
+    def sync(self, since=None, batch=100, dry_run=False, **kw):
+        """Sync bugs modified since the last run to a local store."""
+        store = ItemStore(self.service.connection)
+        try:
+            last_sync = store.get('modified')
+            if since is None:
+                if last_sync is None:
+                    raise BiteError('initial sync requires a starting time, use --since')
+                since = DateTime(last_sync, datetime.fromisoformat(last_sync))
+
+            params = {
+                'status': ['all'],
+                'fields': ['id', 'last_change_time'],
+                'modified': self._modified_since(since),
+            }
+            request = self.service.SearchRequest(params=params)
+
+            self.log(f'Syncing bugs to {store.path!r} with the following options:')
+            self.log_t(request.options, prefix='   - ')
+
+            if dry_run: return
+            queued = store.queue((bug.id, bug.modified) for bug in request.send())
+            # previously interrupted syncs leave their unfinished bugs pending
+            pending = store.pending
+            self.log(f'{len(pending)} bug{pluralism(pending)} to sync ({queued} modified)')
+
+            for i in range(0, len(pending), batch):
+                ids = pending[i:i + batch]
+                request = self.service.GetRequest(ids=ids, get_changes=True)
+                store.update(request.send())
+                self.log(f'Synced {min(i + batch, len(pending))}/{len(pending)} bugs')
+
+            # only move the sync marker forward once all queued bugs are stored
+            pending = store.pending
+            if pending:
+                self.log(f'{len(pending)} bug{pluralism(pending)} not returned by the service, '
+                         'keeping previous sync time')
+            elif store.modified is not None:
+                store['modified'] = store.modified
+            self.log(f'{len(store)} bug{pluralism(len(store))} stored, last modified: {store.modified}')
+        finally:
+            store.close()
+
+    def _modified_since(self, since):
+        """Convert a sync starting time to a search parameter value."""
+        return since
+
     def print_products(self, products):
         if products:
             for p in products:
@@ -312,6 +401,9 @@ class Bugzilla5_0(Bugzilla):
 
     _service = 'bugzilla5.0'
 
+    def _modified_since(self, since):
+        return TimeInterval(str(since), (since, None))
+
     def apikeys(self, generate=None, revoke=None, *args, **kw):
         if generate is not None:
             # TODO: cache generated key for use with bite if it's named 'bite'
@@ -41,6 +41,17 @@ class ParsingError(BiteError):
     pass
 
 
+class DeadlineExceeded(BiteError):
+    """Deadline passed before all requested work finished.
+
+    Any results already returned are incomplete.
+    """
+
+    def __init__(self, deadline):
+        super().__init__(f'deadline of {deadline}s exceeded, results are incomplete')
+        self.deadline = deadline
+
+
 class AuthError(RequestError):
     """Exception related to failed authentication or lack of sufficient privileges."""
 
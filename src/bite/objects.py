@@ -4,6 +4,7 @@ from datetime import datetime
 import lzma
 import os
 import re
+import shutil
 import stat
 import zlib
 
@@ -355,7 +356,12 @@ class Attachment(object):
 
         # don't trust the content type -- users often set the wrong mimetypes
         if self.data is not None:
-            mimetype = magic.from_buffer(self.read(), mime=True)
+            if hasattr(self.data, 'read'):
+                # only sniff the start of downloaded files
+                self.data.seek(0)
+                mimetype = magic.from_buffer(self.data.read(8192), mime=True)
+            else:
+                mimetype = magic.from_buffer(self.read(), mime=True)
             if mimetype == 'application/octet-stream':
                 # assume these are plaintext
                 self.mimetype = 'text/plain'
@@ -375,13 +381,21 @@ class Attachment(object):
     def read(self):
         if isinstance(self.data, str):
             return self.data.encode()
+        elif hasattr(self.data, 'read'):
+            self.data.seek(0)
+            return self.data.read()
         return self.data
 
     def write(self, path):
         try:
             with open(path, 'wb+') as f:
                 os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
-                f.write(self.read(raw=True))
+                if hasattr(self.data, 'read'):
+                    # copy downloaded files without loading them into memory
+                    self.data.seek(0)
+                    shutil.copyfileobj(self.data, f)
+                else:
+                    f.write(self.read(raw=True))
         except Exception as e:
             # toss file stub if it got created
             try:
@@ -16,7 +16,7 @@ from ..argparser import ArgumentParser, parse_file, override_attr
 from ..alias import Aliases
 from ..client import Cli
 from ..config import Config
-from ..exceptions import RequestError
+from ..exceptions import DeadlineExceeded, RequestError
 
 demandload('bite:const')
 
@@ -60,9 +60,43 @@ connect_opts.add_argument(
 connect_opts.add_argument(
     '-C', '--concurrent', type=int,
     help='maximum number of allowed concurrent requests to a service')
+connect_opts.add_argument(
+    '--adaptive', action='store_true', default=None,
+    help='adapt concurrent requests per host to service load, '
+         'using -C/--concurrent as the maximum')
+connect_opts.add_argument(
+    '--window', type=int, metavar='REQUESTS',
+    help='maximum number of requests in flight or awaiting output '
+         '(defaults to twice the number of concurrent requests)')
+connect_opts.add_argument(
+    '--prefetch', type=int, metavar='PAGES',
+    help='number of result pages to request ahead of time (defaults to disabled)')
+connect_opts.add_argument(
+    '--stream', action='store_true', default=None,
+    help='parse large JSON responses incrementally as they arrive (requires ijson)')
+connect_opts.add_argument(
+    '--json-codec', choices=('json', 'orjson'),
+    help='library used to encode and decode JSON (defaults to json, orjson requires orjson)')
 connect_opts.add_argument(
     '--timeout', type=float, metavar='SECONDS',
     help='amount of time to wait before timing out requests (defaults to 30 seconds)')
+connect_opts.add_argument(
+    '--deadline', type=float, metavar='SECONDS',
+    help='maximum amount of time spent on a command, any outstanding requests '
+         'are cancelled and partial results returned when it passes')
+http_cache_opts = connect_opts.add_mutually_exclusive_group()
+http_cache_opts.add_argument(
+    '--http-cache', action='store_true', default=None,
+    help='cache HTTP responses on disk for conditional requests')
+http_cache_opts.add_argument(
+    '--no-http-cache', action='store_false', dest='http_cache', default=None,
+    help='disable caching HTTP responses on disk (default)')
+connect_opts.add_argument(
+    '--max-attempts', type=int, metavar='ATTEMPTS',
+    help='maximum number of attempts for failed idempotent requests (defaults to 3)')
+connect_opts.add_argument(
+    '--retry-budget', type=float, metavar='SECONDS',
+    help='maximum amount of time spent retrying a request (defaults to 60 seconds)')
 
 auth_opts = argparser.add_argument_group('Authentication options')
 single_auth_opts = auth_opts.add_mutually_exclusive_group()
@@ -103,6 +137,12 @@ cache_opts.add_argument(
 cache_opts.add_argument(
     '-r', '--remove', action='store_true',
     help='remove various data caches')
+cache_opts.add_argument(
+    '-i', '--info', action='store_true',
+    help='show information about cached data')
+cache_opts.add_argument(
+    '-p', '--prune', type=int, nargs='?', const=-1, metavar='MB',
+    help='prune cached HTTP responses to the configured or given size')
 
 
 def get_cli(args):
@@ -149,8 +189,9 @@ def _ls(options, out, err):
 
 @cache.bind_final_check
 def _validate_args(parser, namespace):
-    if not namespace.update and not namespace.remove:
-        cache.error('either -u/--update or -r/--remove must be specified')
+    if not any((namespace.update, namespace.remove, namespace.info,
+                namespace.prune is not None)):
+        cache.error('one of -u/--update, -r/--remove, -i/--info, or -p/--prune must be specified')
 
 
 @cache.bind_main_func
@@ -201,5 +242,15 @@ def _validate_args(parser, namespace):
 def main(options, out, err):
     client, fcn_args = get_cli(options)
     cmd = getattr(client, fcn_args.pop('fcn'))
-    cmd(**fcn_args)
+    try:
+        cmd(**fcn_args)
+    except (KeyboardInterrupt, BrokenPipeError):
+        # abandon queued requests, retries, and open streams before exiting
+        client.service.cancel()
+        raise
+    except Exception as e:
+        # errors from work abandoned at the deadline only mean output is incomplete
+        if client.service.expired and not isinstance(e, DeadlineExceeded):
+            raise DeadlineExceeded(client.service.deadline) from e
+        raise
     return 0
@@ -1,16 +1,27 @@
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait)
+from email.utils import parsedate_to_datetime
 from functools import partial
+from itertools import islice
 from multiprocessing import cpu_count
+import random
+import tempfile
+import threading
+import time
 from urllib.parse import urlparse, urlunparse
+import weakref
 
 import requests
 from snakeoil.demandload import demandload
 from snakeoil.sequences import iflatten_instance
 
-from ._reqs import Request, ExtractData
+from ._jobs import (
+    Deferred, Window, after, collect, followup, ident, parse_jobs, req_attrs, results)
+from ._reqs import Request
 from .. import __title__, __version__
-from ..cache import Cache, Auth, Cookies
-from ..exceptions import RequestError, AuthError, BiteError
+from ..cache import Cache, Auth, Cookies, HttpCache
+from ..exceptions import RequestError, AuthError, BiteError, DeadlineExceeded
 from ..objects import Item, Attachment
 
 demandload(
@@ -19,10 +30,98 @@ demandload(
 )
 
 
+class AdaptiveLimit(object):
+    """Adaptively limit the number of concurrent requests to a host.
+
+    Uses an additive increase, multiplicative decrease scheme: the limit grows
+    by one after a full window of successful requests and is halved when the
+    host responds with overload errors, requests time out, or response latency
+    rises well above the observed baseline.
+    """
+
+    # response status codes signifying an overloaded service
+    _overload_codes = frozenset((429, 503))
+    # response latency increase over the baseline that is treated as congestion
+    _latency_factor = 3
+    # smoothing factor for the response latency moving average
+    _alpha = 0.2
+
+    def __init__(self, host, maximum, log=None):
+        self.host = host
+        self.maximum = maximum
+        self.limit = max(1, maximum // 2)
+        self.in_flight = 0
+        self._log = log
+
+        # number of successful requests since the limit was last changed
+        self._successes = 0
+        # smoothed and baseline response latencies in seconds
+        self._latency = None
+        self._baseline = None
+        # time before which the limit isn't decreased again
+        self._hold = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Wait for an available request slot."""
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency=None, status=None, timeout=False):
+        """Release a request slot, adjusting the limit based on its outcome."""
+        with self._cond:
+            self.in_flight -= 1
+            reason = None
+            if timeout:
+                reason = 'request timed out'
+            elif status in self._overload_codes:
+                reason = f'HTTP {status}'
+            elif latency is not None:
+                if self._latency is None:
+                    self._latency = self._baseline = latency
+                else:
+                    self._latency += self._alpha * (latency - self._latency)
+                    # let the baseline slowly follow persistent latency changes
+                    self._baseline = min(self._latency, self._baseline * 1.05)
+                if self._latency > self._baseline * self._latency_factor:
+                    reason = f'latency increased to {self._latency:.2f}s'
+
+            if reason is not None:
+                self._decrease(reason)
+            elif status is not None:
+                self._increase()
+            self._cond.notify_all()
+
+    def _increase(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self._set_limit(self.limit + 1)
+
+    def _decrease(self, reason):
+        now = time.monotonic()
+        # only back off once per round trip for bursts of related failures
+        if now < self._hold:
+            return
+        self._hold = now + (self._latency or 1)
+        if self.limit > 1:
+            self._set_limit(max(1, self.limit // 2), reason)
+
+    def _set_limit(self, limit, reason=None):
+        if self._log is not None:
+            msg = f'{self.host}: concurrency limit {self.limit} -> {limit}'
+            if reason is not None:
+                msg += f' (backing off: {reason})'
+            self._log(msg)
+        self.limit = limit
+        self._successes = 0
+
+
 class Session(requests.Session):
 
     def __init__(self, concurrent=None, verify=True, stream=True,
-                 timeout=None, allow_redirects=False):
+                 timeout=None, allow_redirects=False, adaptive=False, log=None):
         super().__init__()
         self.verify = verify
         self.stream = stream
@@ -40,6 +139,14 @@ class Session(requests.Session):
         self.mount('https://', a)
         self.mount('http://', a)
 
+        # Optionally adjust concurrent requests per host based on how the
+        # service responds, using the static limit as the maximum.
+        self.concurrent = concurrent
+        self.adaptive = adaptive
+        self._log = log
+        self._limits = {}
+        self._limits_lock = threading.Lock()
+
         # Suppress insecure request warnings if SSL cert verification is
         # disabled. Since it's enabled by default we assume when it's disabled
         # the user knows what they're doing.
@@ -57,6 +164,34 @@ class Session(requests.Session):
         if not isinstance(req, requests.PreparedRequest):
             req = self.prepare_request(req)
 
+        if not self.adaptive:
+            return self._send(req, **kw)
+
+        limit = self.host_limit(req.url)
+        limit.acquire()
+        try:
+            response = self._send(req, **kw)
+        except RequestError as e:
+            limit.release(timeout=isinstance(e.__cause__, requests.exceptions.Timeout))
+            raise
+        except BaseException:
+            limit.release()
+            raise
+        limit.release(
+            latency=response.elapsed.total_seconds(), status=response.status_code)
+        return response
+
+    def host_limit(self, url):
+        """Get the adaptive concurrency limit for a given URL's host."""
+        host = urlparse(url).netloc
+        with self._limits_lock:
+            limit = self._limits.get(host)
+            if limit is None:
+                limit = AdaptiveLimit(host, self.concurrent, log=self._log)
+                self._limits[host] = limit
+        return limit
+
+    def _send(self, req, **kw):
         try:
             return super().send(req, **kw)
         except requests.exceptions.RequestException as e:
@@ -74,7 +209,76 @@ class Session(requests.Session):
                 msg = f'request timed out (timeout: {self.timeout}s)'
             else:
                 msg = str(e)
-            raise RequestError(msg, request=e.request, response=e.response)
+            raise RequestError(msg, request=e.request, response=e.response) from e
+
+
+class RetryPolicy(object):
+    """Determine if and when failed requests are retried.
+
+    Only read-only requests are retried, using exponential backoff with full
+    jitter while honoring server provided Retry-After delays.
+    """
+
+    # HTTP methods that are safe to resend, write requests such as PUT modifications
+    # that add comments could be applied twice so they have to opt in
+    _idempotent = frozenset(('GET', 'HEAD', 'OPTIONS'))
+    # response status codes signifying transient failures
+    _status_codes = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, max_attempts=None, budget=None, backoff=0.5, max_backoff=30):
+        # default to trying requests up to three times
+        self.max_attempts = max_attempts if max_attempts is not None else 3
+        # default to spending at most a minute retrying a request
+        self.budget = budget if budget is not None else 60
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retryable(self, method, response=None, error=None, idempotent=None):
+        """Check if a failed request is allowed to be retried.
+
+        Requests are considered safe to resend based on their HTTP method unless
+        explicitly specified, e.g. for read-only RPC calls sent via POST.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in self._idempotent
+        if not idempotent:
+            return False
+        if response is not None:
+            return response.status_code in self._status_codes
+        # retry connection failures and timeouts, but not SSL errors
+        cause = getattr(error, '__cause__', None)
+        return (
+            isinstance(cause, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            and not isinstance(cause, requests.exceptions.SSLError))
+
+    def delay(self, attempt, elapsed, response=None):
+        """Get the delay in seconds before the next attempt, None if out of retries."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if elapsed + delay > self.budget:
+            return None
+        return delay
+
+    @staticmethod
+    def retry_after(response):
+        """Extract the delay requested by a Retry-After response header."""
+        if response is None:
+            return None
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0, date.timestamp() - time.time())
 
 
 class ClientCallbacks(object):
@@ -109,9 +313,25 @@ class Service(object):
     attachment = Attachment
     attachment_endpoint = None
 
+    # HTTP methods for requests that share responses by default
+    _memoize_methods = frozenset(('GET', 'HEAD'))
+    # maximum amount of response content in bytes kept for reuse
+    _memo_size = 64 * 1024 * 1024
+    # support incrementally parsing streamed responses
+    _streaming = False
+    # downloaded content size in bytes kept in memory before spooling to disk
+    _spool_size = 1024 * 1024
+    # Request size limits, requests for more IDs than fit within them are
+    # split into multiple requests sent in parallel.
+    _max_url_length = None
+    _max_body_size = None
+    _max_ids = None
+
     def __init__(self, *, base, endpoint='', connection=None, verify=True, user=None, password=None,
                  auth_file=None, auth_token=None, suffix=None, timeout=None, concurrent=None,
-                 max_results=None, debug=None, verbose=None, **kw):
+                 window=None, adaptive=False, prefetch=None, max_attempts=None,
+                 retry_budget=None, deadline=None, http_cache=False, http_cache_size=None,
+                 stream=False, max_results=None, debug=None, verbose=None, **kw):
         self.base = base
         self.webbase = base
         self.connection = connection
@@ -121,11 +341,44 @@ class Service(object):
         self.verbose = verbose
         self.debug = debug
         self.max_results = max_results
+        # number of pages to request ahead for paged requests lacking totals
+        self.prefetch = prefetch if prefetch is not None else 0
+        self.retry = RetryPolicy(max_attempts=max_attempts, budget=retry_budget)
+        # parse large responses as they're received when supported
+        self.stream = stream and self._streaming
+
+        # completed and in-flight responses shared between identical requests
+        self._memo = OrderedDict()
+        self._memo_bytes = 0
+        self._inflight = {}
+        self._memo_lock = threading.Lock()
+
+        # set when outstanding work should be abandoned
+        self._cancelled = threading.Event()
+        # streamed responses currently being consumed
+        self._streams = weakref.WeakSet()
+        self._streams_lock = threading.Lock()
+
+        # Optional time budget in seconds for all work done by the service,
+        # outstanding work is cancelled once it runs out.
+        self.deadline = deadline
+        self._deadline = None
+        self._expired = False
+        if deadline is not None:
+            self._deadline = time.monotonic() + deadline
+            timer = threading.Timer(deadline, self._expire)
+            timer.daemon = True
+            timer.start()
 
         self.client = ClientCallbacks()
 
         # max workers defaults to system CPU count * 5 if concurrent is None
-        self.executor = ThreadPoolExecutor(max_workers=concurrent)
+        self.concurrent = concurrent if concurrent is not None else cpu_count() * 5
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrent)
+        # Maximum number of requests in flight or completed but not yet
+        # consumed per send, defaulting to twice the number of workers so they
+        # stay busy while finished results wait on the consumer.
+        self.window = window if window is not None else self.concurrent * 2
 
         url = urlparse(self.base)
         self._base = urlunparse((
@@ -138,14 +391,32 @@ class Service(object):
         self.cache = self._cache_cls(connection=connection)
         self.auth = Auth(connection, path=auth_file, token=auth_token)
 
-        concurrent = self.executor._max_workers
-        self.session = Session(concurrent=concurrent, verify=verify, timeout=timeout)
+        # cache size is configured in MB
+        if http_cache_size is not None:
+            http_cache_size *= 1024 * 1024
+        self.http_cache = HttpCache(connection, max_size=http_cache_size)
+        # response bodies are only written to disk when explicitly requested
+        self._http_cache_enabled = bool(http_cache)
+
+        self.session = Session(
+            concurrent=self.concurrent, verify=verify, timeout=timeout,
+            adaptive=adaptive, log=self._verbose_output)
         self._web_session = None
 
         # login if user/pass was specified and the auth token isn't set
         if not self.auth and all((user, password)):
             self.login(user=user, password=password, **kw)
 
+    def _verbose_output(self, msg):
+        """Output a progress message in verbose mode."""
+        if self.verbose:
+            self.client.progress_output(msg)
+
+    def _debug_output(self, msg):
+        """Output a progress message in debug mode."""
+        if self.debug:
+            self.client.progress_output(msg)
+
     @property
     def cache_updates(self):
         """Pull latest data from service for cache update."""
@@ -299,62 +570,157 @@ class Service(object):
                 self.session.cookies.save()
             self.session.close()
 
+    def batch(self, reqs):
+        """Merge requests that can be sent together into a batch request.
+
+        Returns None if the service doesn't support batching the requests.
+        """
+        return None
+
     def send(self, *reqs, **kw):
         """Send requests and return parsed response data."""
-        # TODO: simplify this using async/await
         if not reqs:
             return None
 
-        ident = lambda x: x
-
-        def _parse(parse, iterate, reqs, generator=False):
-            results = iterate(x.result() for x in reqs)
-            if len(reqs) == 1 and not generator:
-                results = next(results)
-            return parse(results)
-
-        def _send_jobs(reqs):
-            jobs = []
-            for req in iflatten_instance(reqs, Request):
-                parse = getattr(req, 'parse', ident)
-                iterate = getattr(req, '_iterate', ExtractData)
-                req_parse = getattr(req, 'parse_response', None)
-                raw = getattr(req, '_raw', None)
-                generator = bool(getattr(req, '_reqs', ()))
-
-                if isinstance(req, Request) and len(req) > 1:
+        def _send_jobs(reqs, followup_func=None):
+            reqs = list(iflatten_instance(reqs, Request))
+            batch = self.batch(reqs)
+            if batch is not None:
+                batch_job = self.executor.submit(batch.send_batch, **kw)
+            for req in reqs:
+                (parse, iterate, req_parse, raw, memoize, retry, stream, download,
+                 req_followup, generator) = req_attrs(req)
+
+                if batch is not None and req in batch.reqs:
+                    job = batch.job(batch_job, batch.reqs.index(req), **kw)
+                    yield after([job], parse_jobs, parse, iterate, [job])
+                elif isinstance(req, Request) and len(req) > 1:
                     # force subreqs to be sent and parsed in parallel
-                    data = _send_jobs(iter(req))
-                    jobs.append(self.executor.submit(_parse, parse, iterate, data))
+                    data = Window(_send_jobs(iter(req), req_followup), self.window)
+                    job = Deferred(parse_jobs, parse, iterate, data, True)
+                    job.deps = (data,)
+                    yield job
                 else:
                     http_reqs = []
                     if not hasattr(req, '__iter__'):
                         req = [req]
+                    if req_followup is None:
+                        req_followup = followup_func
 
                     for r in iflatten_instance(req, requests.Request):
                         if isinstance(r, requests.Request):
                             func = partial(
-                                self._http_send, raw=raw, req_parse=req_parse, **kw)
+                                self._http_send, raw=raw, req_parse=req_parse,
+                                memoize=memoize, retry=retry, stream=stream,
+                                download=download, **kw)
                         else:
                             func = ident
-                        http_reqs.append(self.executor.submit(func, r))
+                        job = self.executor.submit(func, r)
+                        if req_followup is not None:
+                            job = followup(job, req_followup)
+                        http_reqs.append(job)
 
                     if http_reqs:
-                        jobs.append(self.executor.submit(
-                            _parse, parse, iterate, http_reqs, generator))
-            return jobs
+                        yield after(
+                            http_reqs, parse_jobs, parse, iterate, http_reqs, generator)
 
-        data = (x.result() for x in _send_jobs(reqs))
+        data = collect(Window(_send_jobs(reqs), self.window))
+        return results(reqs, data)
 
-        generator = isinstance(reqs[0], (list, tuple))
-        if len(reqs) == 1 and not generator:
-            return next(data)
-        else:
-            return data
+    @property
+    def cancelled(self):
+        """Whether outstanding requests have been cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Abandon all outstanding work.
 
-    def _http_send(self, req, raw=None, req_parse=None, **kw):
+        Queued requests are dropped, pending retries and pagination stop, and
+        open streamed responses are closed. Any requests sent afterwards raise
+        CancelledError.
+        """
+        self._cancelled.set()
+        with self._streams_lock:
+            streams = list(self._streams)
+        for response in streams:
+            response.close()
+
+    @property
+    def expired(self):
+        """Whether outstanding requests were cancelled due to the deadline passing."""
+        return self._expired
+
+    @property
+    def remaining(self):
+        """Seconds left before the deadline or None if no deadline is set."""
+        if self._deadline is None:
+            return None
+        return max(0, self._deadline - time.monotonic())
+
+    def _expire(self):
+        """Cancel all outstanding work once the deadline passes."""
+        self._expired = True
+        self.cancel()
+
+    def _check_cancelled(self):
+        """Raise an error if outstanding work has been cancelled."""
+        if not self._expired and self.remaining == 0:
+            self._expire()
+        if self._cancelled.is_set():
+            if self._expired:
+                raise DeadlineExceeded(self.deadline)
+            raise CancelledError()
+
+    def send_unordered(self, reqs, **kw):
+        """Send requests, yielding their results in order of completion.
+
+        The results of each request are collected into a tuple before being
+        yielded so a slow request doesn't hold up the output of the others. At
+        most the service's window of requests are outstanding at once.
+        """
+        def collect(req):
+            return tuple(req.send(**kw))
+
+        reqs = iter(reqs)
+        executor = ThreadPoolExecutor(max_workers=self.window)
+        try:
+            pending = {executor.submit(collect, x) for x in islice(reqs, self.window)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for job in done:
+                    pending.update(executor.submit(collect, x) for x in islice(reqs, 1))
+                    yield job.result()
+        finally:
+            for job in pending:
+                job.cancel()
+            executor.shutdown(wait=False)
+
+    def _http_send(self, req, raw=None, req_parse=None, memoize=None, retry=None,
+                   stream=None, download=False, **kw):
         """Send an HTTP request and return the parsed response."""
-        response = self.session.send(req, **kw)
+        self._check_cancelled()
+        if not self.stream:
+            stream = None
+        if memoize is None:
+            memoize = req.method.upper() in self._memoize_methods
+        if stream is not None or download:
+            # streamed responses are consumed while parsing so they can't be shared
+            response = self._retry_send(req, retry=retry, **kw)
+            with self._streams_lock:
+                self._streams.add(response)
+            # the service may have been cancelled before the response was tracked
+            if self._cancelled.is_set():
+                response.close()
+                raise CancelledError()
+        elif memoize:
+            response = self._coalesced_send(req, retry=retry, **kw)
+        else:
+            try:
+                response = self._cached_send(req, retry=retry, **kw)
+            finally:
+                # writes may modify the data of shared responses, even failed ones
+                if req.method.upper() not in self._memoize_methods:
+                    self._clear_memo()
 
         if response.status_code == 301:
             old = self.base
@@ -367,14 +733,216 @@ class Service(object):
             # allow the request to parse itself as requested
             if req_parse is not None:
                 return req_parse(response)
+            elif download:
+                return self._download(response)
             # return the raw content of the response either in bytes or unicode
             elif raw:
                 raw = 'content' if raw is True else raw
                 return getattr(response, raw)
+            elif stream is not None:
+                return self.parse_response(response, stream=stream)
             return self.parse_response(response)
         else:
             self._failed_http_response(response)
 
+    def _download(self, response):
+        """Write the content of a streamed response to a temporary file.
+
+        Content is kept in memory up to the spool size and then written to disk
+        as it's received.
+        """
+        f = tempfile.SpooledTemporaryFile(max_size=self._spool_size)
+        try:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                self._check_cancelled()
+                f.write(chunk)
+        except CancelledError:
+            f.close()
+            raise
+        except requests.exceptions.RequestException as e:
+            f.close()
+            raise RequestError(
+                f'failed downloading: {response.url}',
+                request=response.request, response=response) from e
+        finally:
+            response.close()
+        f.seek(0)
+        return f
+
+    @staticmethod
+    def _request_key(req):
+        """Key identifying equivalent prepared requests."""
+        body = req.body
+        if isinstance(body, str):
+            body = body.encode()
+        return (
+            req.method, req.url, body,
+            req.headers.get('Authorization'), req.headers.get('Cookie'))
+
+    def _coalesced_send(self, req, **kw):
+        """Send an HTTP request, sharing responses between identical requests.
+
+        Identical requests sent concurrently wait on the first one while
+        successful responses are kept for reuse for the life of the service.
+        """
+        if not isinstance(req, requests.PreparedRequest):
+            req = self.session.prepare_request(req)
+        key = self._request_key(req)
+
+        with self._memo_lock:
+            response = self._memo.get(key)
+            if response is not None:
+                self._memo.move_to_end(key)
+                return response
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            response = self._cached_send(req, **kw)
+            # load the content so the response can be shared
+            size = len(response.content)
+        except BaseException as e:
+            with self._memo_lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._memo_lock:
+            del self._inflight[key]
+            if response.ok and size <= self._memo_size:
+                self._memo[key] = response
+                self._memo_bytes += size
+                # drop the least recently used responses
+                while self._memo_bytes > self._memo_size:
+                    _, old = self._memo.popitem(last=False)
+                    self._memo_bytes -= len(old.content)
+        future.set_result(response)
+        return response
+
+    def _clear_memo(self):
+        """Drop all responses kept for reuse."""
+        with self._memo_lock:
+            self._memo.clear()
+            self._memo_bytes = 0
+
+    # response headers that don't apply to cached, decoded response bodies
+    _uncached_headers = frozenset((
+        'connection', 'content-encoding', 'content-length', 'keep-alive',
+        'set-cookie', 'transfer-encoding'))
+
+    def _cached_send(self, req, **kw):
+        """Send an HTTP GET request using conditional requests for cached responses."""
+        if not self._http_cache_enabled or req.method.upper() != 'GET':
+            return self._retry_send(req, **kw)
+
+        if not isinstance(req, requests.PreparedRequest):
+            req = self.session.prepare_request(req)
+        key = self.http_cache.key(
+            req.url, req.headers.get('Authorization'), req.headers.get('Cookie'))
+        entry = self.http_cache.get(key)
+        if entry is not None:
+            meta, body = entry
+            if meta.get('etag'):
+                req.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                req.headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self._retry_send(req, **kw)
+
+        if response.status_code == 304 and entry is not None:
+            self._debug_output(f'using cached response: {req.url}')
+            return self._cached_response(response, meta, body)
+
+        if response.ok and 'no-store' not in response.headers.get('Cache-Control', ''):
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                headers = {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() not in self._uncached_headers}
+                meta = {
+                    'url': req.url,
+                    'status': response.status_code,
+                    'reason': response.reason,
+                    'headers': headers,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                }
+                try:
+                    self.http_cache.set(key, meta, response.content)
+                except BiteError as e:
+                    # caching is best effort, e.g. the disk may be full
+                    self._debug_output(str(e))
+        return response
+
+    @staticmethod
+    def _cached_response(response, meta, body):
+        """Replay a cached response using the related not modified response."""
+        cached = requests.models.Response()
+        cached.status_code = meta['status']
+        cached.reason = meta['reason']
+        cached.headers = requests.structures.CaseInsensitiveDict(meta['headers'])
+        cached.encoding = requests.utils.get_encoding_from_headers(cached.headers)
+        cached._content = body
+        cached.url = response.url
+        cached.request = response.request
+        cached.elapsed = response.elapsed
+        cached.connection = response.connection
+        response.close()
+        return cached
+
+    def _retry_send(self, req, retry=None, **kw):
+        """Send an HTTP request, retrying transient failures.
+
+        Only read-only requests are retried, as determined by the HTTP
+        method if retry isn't explicitly enabled or disabled.
+        """
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            self._check_cancelled()
+            remaining = self.remaining
+            if remaining is not None:
+                # requests can't outlast the remaining time budget
+                timeout = kw.get('timeout', self.session.timeout)
+                kw['timeout'] = remaining if timeout is None else min(timeout, remaining)
+            response = None
+            try:
+                response = self.session.send(req, **kw)
+            except RequestError as e:
+                # failures due to running out of time aren't retried
+                self._check_cancelled()
+                if not self.retry.retryable(req.method, error=e, idempotent=retry):
+                    raise
+                delay = self.retry.delay(attempt, time.monotonic() - start)
+                if delay is None:
+                    raise
+                reason = str(e)
+            else:
+                if not self.retry.retryable(
+                        req.method, response=response, idempotent=retry):
+                    return response
+                delay = self.retry.delay(attempt, time.monotonic() - start, response=response)
+                if delay is None:
+                    return response
+                reason = f'HTTP {response.status_code}'
+                response.close()
+
+            self._debug_output(
+                f'retrying {req.method} {req.url} in {delay:.2f}s '
+                f'(attempt {attempt + 1}/{self.retry.max_attempts}): {reason}')
+            # wake early to stop retrying if the service is cancelled
+            if self._cancelled.wait(delay):
+                self._check_cancelled()
+            attempt += 1
+
     def _failed_http_response(self, response):
         if response.status_code == 401:
             raise AuthError('authentication failed', text=response.text)
@@ -0,0 +1,188 @@
+"""Tracking of the jobs used to send requests and collect their parsed results."""
+
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from functools import partial
+from itertools import islice
+import threading
+
+from ._reqs import ExtractData
+
+
+def ident(x):
+    return x
+
+
+def req_attrs(req):
+    """Pull the parsing related attributes from a request object."""
+    parse = getattr(req, 'parse', ident)
+    iterate = getattr(req, '_iterate', ExtractData)
+    req_parse = getattr(req, 'parse_response', None)
+    raw = getattr(req, '_raw', None)
+    memoize = getattr(req, '_memoize', None)
+    retry = getattr(req, '_retry', None)
+    stream = getattr(req, '_stream', None)
+    download = getattr(req, '_download', False)
+    followup = getattr(req, '_followup', None)
+    generator = bool(getattr(req, '_reqs', ()))
+    return (
+        parse, iterate, req_parse, raw, memoize, retry, stream, download,
+        followup, generator)
+
+
+def collect(jobs):
+    """Yield the results of jobs, cancelling the remaining ones if iteration stops."""
+    try:
+        for job in jobs:
+            yield job.result()
+    finally:
+        if isinstance(jobs, Window):
+            jobs.cancel()
+
+
+def after(deps, func, *args):
+    """Run a function once all the futures it depends on are finished.
+
+    The function is run by the thread finishing the last dependency so jobs
+    depending on the results of others never hold a worker while waiting.
+    """
+    future = Future()
+    remaining = len(deps)
+    lock = threading.Lock()
+
+    def run(_dep=None):
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining > 0:
+                return
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    if deps:
+        for dep in deps:
+            dep.add_done_callback(run)
+    else:
+        run()
+    cancel_with(future, *deps)
+    return future
+
+
+def followup(job, func):
+    """Send follow-up requests as soon as the data they depend on is received.
+
+    Returns a future for the job's data paired with the follow-up results.
+    """
+    future = Future()
+
+    def done(job):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            data = job.result()
+            future.set_result((data, func(data)))
+        except BaseException as e:
+            future.set_exception(e)
+
+    job.add_done_callback(done)
+    cancel_with(future, job)
+    return future
+
+
+def parse_jobs(parse, iterate, jobs, generator=False):
+    """Parse the results of a given set of jobs."""
+    data = iterate(collect(jobs))
+    if not generator and len(jobs) == 1:
+        data = next(data)
+    return parse(data)
+
+
+def results(reqs, data):
+    """Return singular results for singular requests, otherwise an iterator."""
+    generator = isinstance(reqs[0], (list, tuple))
+    if len(reqs) == 1 and not generator:
+        return next(data)
+    return data
+
+
+class Deferred(object):
+    """Lazily run a function the first time its result is requested.
+
+    Mirrors the result() method of concurrent futures so deferred parsing jobs
+    can be mixed with regular futures.
+    """
+
+    # jobs cancelled along with the deferred function
+    deps = ()
+
+    def __init__(self, func, *args, **kw):
+        self._func = partial(func, *args, **kw)
+        self._done = False
+        self._value = None
+        self._exc = None
+
+    def result(self):
+        if not self._done:
+            try:
+                self._value = self._func()
+            except Exception as e:
+                self._exc = e
+            self._done = True
+        if self._exc is not None:
+            raise self._exc
+        return self._value
+
+    def cancel(self):
+        """Stop the function from running, cancelling the jobs it depends on."""
+        if self._done:
+            return False
+        self._done = True
+        self._exc = CancelledError()
+        for dep in self.deps:
+            dep.cancel()
+        return True
+
+
+class Window(object):
+    """Iterator over jobs lazily submitted within a bounded window.
+
+    The window is filled immediately and a new job is only submitted as each
+    earlier one is consumed, so memory use stays flat regardless of the number
+    of requests sent.
+    """
+
+    def __init__(self, jobs, size):
+        self._jobs = jobs
+        self._pending = deque(islice(jobs, size))
+        self._started = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # refill the slot of the previously consumed job
+        if self._started:
+            self._pending.extend(islice(self._jobs, 1))
+        self._started = True
+        if not self._pending:
+            raise StopIteration
+        return self._pending.popleft()
+
+    def cancel(self):
+        """Cancel all pending jobs and stop submitting new ones."""
+        self._jobs = iter(())
+        while self._pending:
+            self._pending.popleft().cancel()
+
+
+def cancel_with(future, *jobs):
+    """Cancel jobs when the future depending on them is cancelled."""
+    def cancel(future):
+        if future.cancelled():
+            for job in jobs:
+                job.cancel()
+    future.add_done_callback(cancel)
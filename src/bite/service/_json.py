@@ -1,31 +1,277 @@
+from codecs import BOM_UTF8
+from collections import deque
+from collections.abc import Mapping
+
 try: import simplejson as json
 except ImportError: import json
 
+try: import orjson
+except ImportError: orjson = None
+
+try: import ijson
+except ImportError: ijson = None
+
 from snakeoil.klass import steal_docs
 
 from . import Service
-from ..exceptions import ParsingError, RequestError
+from ..exceptions import BiteError, ParsingError, RequestError
+
+
+class JsonCodec(object):
+    """JSON codec using the json module from the standard library.
+
+    The simplejson module is used instead when it's installed.
+    """
+
+    name = 'json'
+
+    @staticmethod
+    def dumps(obj):
+        """Encode an object to JSON bytes."""
+        return json.dumps(obj).encode()
+
+    @staticmethod
+    def loads(data, **kw):
+        """Decode JSON from bytes or a string."""
+        return json.loads(data, **kw)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec using orjson.
+
+    Decoding options such as object hooks aren't supported by orjson so
+    decoding using them falls back to the standard library.
+    """
+
+    name = 'orjson'
+
+    @staticmethod
+    def dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def loads(data, **kw):
+        if kw:
+            return JsonCodec.loads(data, **kw)
+        # orjson rejects byte order marks that the json module strips
+        if isinstance(data, bytes) and data.startswith(BOM_UTF8):
+            data = data[len(BOM_UTF8):]
+        return orjson.loads(data)
+
+
+# supported JSON codecs
+JSON_CODECS = {
+    'json': (JsonCodec, json),
+    'orjson': (OrjsonCodec, orjson),
+}
+
+
+def get_codec(name=None):
+    """Get a JSON codec by name, defaulting to the standard library."""
+    if name is None:
+        name = 'json'
+    try:
+        codec, module = JSON_CODECS[name]
+    except KeyError:
+        raise BiteError(f'unknown JSON codec: {name!r}')
+    if module is None:
+        raise BiteError(f'{name} JSON codec requires {name} to be installed')
+    return codec
+
+
+def _build(events, event, value):
+    """Decode the JSON value starting with the given parser event."""
+    if event not in ('start_map', 'start_array'):
+        return value
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1
+    while depth:
+        _prefix, event, value = next(events)
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+    return builder.value
+
+
+class _StreamedArray(object):
+    """Array of a streamed JSON document decoded element by element as it's iterated over.
+
+    Elements are buffered if the document has to be parsed past the array
+    before they're consumed.
+    """
+
+    def __init__(self, events):
+        self._events = events
+        self._buffer = deque()
+        self.done = False
+
+    def _decode(self):
+        _prefix, event, value = next(self._events)
+        if event == 'end_array':
+            self.done = True
+        else:
+            self._buffer.append(_build(self._events, event, value))
+
+    @property
+    def consumed(self):
+        return self.done
+
+    def drain(self):
+        """Decode all remaining elements into the buffer."""
+        while not self.done:
+            self._decode()
+
+    def __iter__(self):
+        while True:
+            if self._buffer:
+                yield self._buffer.popleft()
+            elif self.done:
+                return
+            else:
+                self._decode()
+
+
+class _StreamedObject(Mapping):
+    """Object of a streamed JSON document with its values decoded on demand.
+
+    Values along the streamed path are returned lazily, all others are decoded
+    into memory. Membership tests and get() don't parse past the streamed
+    value until it has been consumed, so keys following it in the document
+    appear to be missing until then.
+    """
+
+    def __init__(self, events, path):
+        self._events = events
+        self._path = path
+        self._values = {}
+        self._streamed = None
+        self.done = False
+
+    def _decode(self):
+        """Decode the next key/value pair of the object."""
+        if self._streamed is not None:
+            self._streamed.drain()
+            self._streamed = None
+
+        _prefix, event, key = next(self._events)
+        if event == 'end_map':
+            self.done = True
+            return
+
+        _prefix, event, value = next(self._events)
+        if key == self._path[0] and event == 'start_array' and len(self._path) == 1:
+            value = self._streamed = _StreamedArray(self._events)
+        elif key == self._path[0] and event == 'start_map' and len(self._path) > 1:
+            value = self._streamed = _StreamedObject(self._events, self._path[1:])
+        else:
+            value = _build(self._events, event, value)
+        self._values[key] = value
+
+    @property
+    def consumed(self):
+        """Whether the streamed value along the path has been fully decoded."""
+        if self._streamed is not None:
+            return self._streamed.consumed
+        return self.done
+
+    def drain(self):
+        """Decode all remaining values."""
+        while not self.done:
+            self._decode()
+
+    def _lookup(self, key, block):
+        while key not in self._values and not self.done:
+            if not block and self._streamed is not None and not self._streamed.consumed:
+                break
+            self._decode()
+
+    def __getitem__(self, key):
+        self._lookup(key, block=True)
+        return self._values[key]
+
+    def __contains__(self, key):
+        self._lookup(key, block=False)
+        return key in self._values
+
+    def get(self, key, default=None):
+        self._lookup(key, block=False)
+        return self._values.get(key, default)
+
+    def __iter__(self):
+        self.drain()
+        return iter(self._values)
+
+    def __len__(self):
+        self.drain()
+        return len(self._values)
+
+
+class _ResponseReader(object):
+    """File-like wrapper reading the decoded content of a streamed response."""
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self._chunks = response.iter_content(chunk_size=chunk_size)
+
+    def read(self, size=-1):
+        # ijson probes the content type using empty reads
+        if not size:
+            return b''
+        return next(self._chunks, b'')
 
 
 class Json(Service):
     """Support generic services that use JSON to communicate."""
 
-    def __init__(self, **kw):
-        super().__init__(**kw)
+    _streaming = True
+
+    def __init__(self, stream=False, json_codec=None, **kw):
+        if stream and ijson is None:
+            raise BiteError('streaming JSON parsing requires ijson to be installed')
+        self.codec = get_codec(json_codec)
+        super().__init__(stream=stream, **kw)
         self.session.headers.update({
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         })
 
     @steal_docs(Service)
-    def parse_response(self, response, **kw):
+    def parse_response(self, response, stream=None, **kw):
         if not response.headers.get('Content-Type', '').startswith('application/json'):
             msg = 'non-JSON response from server'
             if not self.verbose:
                 msg += ' (use verbose mode to see it)'
             raise RequestError(
                 msg, code=response.status_code, text=response.text, response=response)
+        if stream is not None:
+            return self._parse_stream(response, stream)
+        # decode directly from the response content, skipping conversion to a string
         try:
-            return response.json(**kw)
-        except json.decoder.JSONDecodeError as e:
+            return self.codec.loads(response.content, **kw)
+        except ValueError as e:
             raise ParsingError(msg='failed parsing JSON', text=str(e))
+
+    @staticmethod
+    def _parse_stream(response, path):
+        """Incrementally parse a JSON response object.
+
+        The array found at the given path of keys is decoded element by
+        element as it's iterated over, bounding memory use to roughly the size
+        of a single element for arbitrarily large responses.
+        """
+        def events():
+            try:
+                yield from ijson.parse(_ResponseReader(response), use_float=True)
+            except ijson.JSONError as e:
+                raise ParsingError(msg='failed parsing JSON', text=str(e))
+
+        events = events()
+        try:
+            _prefix, event, _value = next(events)
+        except StopIteration:
+            raise ParsingError(msg='failed parsing JSON', text='empty response')
+        if event != 'start_map':
+            raise ParsingError(msg='failed parsing JSON', text='expected JSON object')
+        return _StreamedObject(events, tuple(path))
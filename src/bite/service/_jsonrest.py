@@ -1,6 +1,3 @@
-try: import simplejson as json
-except ImportError: import json
-
 from ._json import Json
 from ._rest import REST
 
@@ -8,14 +5,12 @@ from ._rest import REST
 class JsonREST(Json, REST):
     """Support generic JSON-based REST services."""
 
-    @staticmethod
-    def _encode_request(params=None):
+    def _encode_request(self, params=None):
         """Encode the data body for a request."""
         if params is None:
             params = {}
-        return json.dumps({**params})
+        return self.codec.dumps({**params})
 
-    @staticmethod
-    def _decode_request(request):
+    def _decode_request(self, request):
         """Decode the data body of a request."""
-        return json.loads(request.data)
+        return self.codec.loads(request.data)
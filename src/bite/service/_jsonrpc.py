@@ -1,11 +1,9 @@
-try: import simplejson as json
-except ImportError: import json
-
 from snakeoil.klass import steal_docs
 
 from . import Service
 from ._json import Json
-from ._rpc import Rpc
+from ._rpc import Rpc, BatchRequest
+from ..utils import str2bool
 
 
 class MulticallIterator(object):
@@ -45,13 +43,34 @@ class Jsonrpc(Json, Rpc):
     """Support generic JSON-RPC 1.0 services.
 
     Spec: http://www.jsonrpc.org/specification_v1
+
+    Multiple calls are sent as JSON-RPC 2.0 batches when the server supports
+    them: http://www.jsonrpc.org/specification#batch
     """
 
     _multicall_iter = MulticallIterator
+    _batch_cls = BatchRequest
+
+    @property
+    def _batching(self):
+        """Whether the server accepts batched calls, stored per connection."""
+        batching = self.cache.get('batching')
+        if isinstance(batching, str):
+            # cached settings are loaded as strings
+            batching = str2bool(batching)
+        return batching
+
+    @_batching.setter
+    def _batching(self, batching):
+        self.cache['batching'] = batching
+        try:
+            self.cache.write()
+        except IOError:
+            # support is determined again by the next batch
+            pass
 
-    @staticmethod
     @steal_docs(Service)
-    def _encode_request(method, params=None, id=0):
+    def _encode_request(self, method, params=None, id=0):
         if isinstance(params, (list, tuple)):
             params = tuple(params)
         else:
@@ -62,20 +81,55 @@ class Jsonrpc(Json, Rpc):
             'params': params,
             'id': id,
         }
-        return json.dumps(data)
+        return self.codec.dumps(data)
 
-    @staticmethod
     @steal_docs(Service)
-    def _decode_request(request):
-        data = json.loads(request.data)
+    def _decode_request(self, request):
+        data = self.codec.loads(request.data)
         params = data['params']
         method = data['method']
         id = data['id']
         return method, params, id
 
+    @steal_docs(Rpc)
+    def _encode_batch(self, reqs):
+        calls = []
+        for i, req in enumerate(reqs):
+            method, params, _id = self._decode_request(req._req)
+            calls.append({'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i})
+        return self.codec.dumps(calls)
+
+    @steal_docs(Rpc)
+    def _decode_batch(self, data, reqs):
+        # servers lacking batch support return a single error object
+        if not isinstance(data, list):
+            return None
+        responses = {x.get('id'): x for x in data if isinstance(x, dict)}
+        if set(responses) != set(range(len(reqs))):
+            return None
+
+        results = []
+        for i in range(len(reqs)):
+            error = responses[i].get('error')
+            if error is None:
+                results.append(responses[i].get('result'))
+            else:
+                try:
+                    self.handle_error(code=error.get('code'), msg=error.get('message'))
+                except Exception as e:
+                    error = e
+                results.append(error)
+        return results
+
     @steal_docs(Service)
-    def parse_response(self, response, **kw):
+    def parse_response(self, response, stream=None, **kw):
+        if stream is not None:
+            # stream paths are relative to the call result
+            kw['stream'] = ('result',) + tuple(stream)
         data = super().parse_response(response, **kw)
+        if isinstance(data, list):
+            # batch responses are parsed per call
+            return data
         error = data.get('error')
         if error is None:
             return data['result']
@@ -1,5 +1,9 @@
+import copy
 from functools import partial
+from math import ceil
+import queue
 import re
+import threading
 
 import requests
 from snakeoil.strings import pluralism
@@ -55,6 +59,28 @@ class Request(object):
 
     _iterate = ExtractData
 
+    # Allow identical HTTP requests to share responses, by default only
+    # requests using safe HTTP methods are shared.
+    _memoize = None
+
+    # Allow retrying transient failures regardless of the HTTP method, by
+    # default only GET, HEAD, and OPTIONS requests are retried.
+    _retry = None
+
+    # Path of keys to the array of items in the response document, allowing
+    # the items to be parsed as they're received when streaming is enabled.
+    _stream = None
+
+    # Download the response content into a temporary file instead of parsing
+    # it, used for large files that shouldn't be kept in memory.
+    _download = False
+
+    # Method sending follow-up requests that depend on the data of each
+    # subrequest response as soon as it's received, returning their results
+    # without waiting on them. When set, parse() is passed (data, results)
+    # tuples instead of the bare response data.
+    _followup = None
+
     def __init__(self, *, service, url=None, method=None, params=None,
                  reqs=None, options=None, raw=None, **kw):
         self.service = service
@@ -105,10 +131,13 @@ class Request(object):
 
     @staticmethod
     def _http_req_str(req):
+        body = req.body
+        if isinstance(body, bytes):
+            body = body.decode(errors='replace')
         return '{}\n{}\n\n{}'.format(
             req.method + ' ' + req.url,
             '\n'.join('{}: {}'.format(k, v) for k, v in req.headers.items()),
-            req.body,
+            body,
         )
 
     def __str__(self):
@@ -159,11 +188,146 @@ class NullRequest(Request):
         return self._none_gen
 
 
+class SplitRequest(Request):
+    """Split requests for too many IDs into multiple requests sent in parallel.
+
+    The IDs are split into chunks fitting within the URL length, body size,
+    and ID count limits of the service. The chunk responses are merged into a
+    single response, ordering item arrays by the position of their IDs in the
+    original request, which is then parsed as usual.
+    """
+
+    # param key holding the requested IDs
+    _ids_key = 'ids'
+    # separator for IDs joined into a single param value, None for ID lists
+    _ids_sep = None
+    # item key matched against the requested IDs when ordering merged items
+    _item_key = 'id'
+
+    # chunk requests if split, determined on first use
+    _chunks = None
+    # whether the request is a chunk of a split request
+    _chunk = False
+
+    @property
+    def _split_reqs(self):
+        if self._chunks is None:
+            self._chunks = self._split()
+        return self._chunks
+
+    @property
+    def _requests(self):
+        if self._split_reqs:
+            yield from self._split_reqs
+        else:
+            yield from super()._requests
+
+    @property
+    def _iterate(self):
+        if self._split_reqs:
+            return self._merge
+        return super()._iterate
+
+    def send(self, **kw):
+        # chunks are requested as single pages
+        if self._split_reqs:
+            return self.service.send(self, **kw)
+        return super().send(**kw)
+
+    @property
+    def _requested_ids(self):
+        ids = self.params.get(self._ids_key)
+        if isinstance(ids, str):
+            ids = ids.split(self._ids_sep) if self._ids_sep is not None else [ids]
+        return list(ids) if ids else []
+
+    def _limits(self):
+        """Return the ID count, URL length, and body size limits for chunks."""
+        max_ids = self.service._max_ids
+        # chunks must fit within a single page of results
+        if isinstance(self, _BasePagedRequest) and self.service.max_results is not None:
+            max_ids = min(filter(None, (max_ids, self.service.max_results)))
+        return max_ids, self.service._max_url_length, self.service._max_body_size
+
+    def _split(self):
+        """Split the request into chunk requests if it exceeds the service limits."""
+        ids = self._requested_ids
+        limits = self._limits()
+        if len(ids) < 2 or not any(limits):
+            return ()
+        chunks = self._split_ids(ids, limits)
+        return tuple(chunks) if len(chunks) > 1 else ()
+
+    def _split_ids(self, ids, limits):
+        req = self._chunk_request(ids)
+        sizes = (len(ids),) + self._request_size(req)
+        if len(ids) == 1 or all(x is None or size <= x for size, x in zip(sizes, limits)):
+            return [req]
+
+        # estimate the number of chunks assuming sizes grow linearly with the
+        # number of IDs, chunks still too large are split again
+        count = max(ceil(size / x) for size, x in zip(sizes, limits) if x)
+        chunk_size = ceil(len(ids) / max(count, 2))
+        chunks = []
+        for i in range(0, len(ids), chunk_size):
+            chunks.extend(self._split_ids(ids[i:i + chunk_size], limits))
+        return chunks
+
+    def _chunk_request(self, ids):
+        """Create a copy of the request targeting a subset of its IDs."""
+        req = copy.copy(self)
+        req._req = copy.copy(self._req)
+        req.params = self.params.copy()
+        if self._ids_sep is not None:
+            req.params[self._ids_key] = self._ids_sep.join(map(str, ids))
+        else:
+            req.params[self._ids_key] = list(ids)
+        req._finalized = False
+        req._chunks = ()
+        req._chunk = True
+        req._stream = None
+        # chunk responses are merged and parsed by the original request
+        req.parse = partial(Request.parse, req)
+        return req
+
+    def _request_size(self, req):
+        """Return the URL length and body size of a request."""
+        if not req._finalized:
+            req._finalize()
+        prepared = self.service.session.prepare_request(req._req)
+        return len(prepared.url), len(prepared.body or b'')
+
+    def _merge(self, results):
+        """Merge chunk responses, ordering item arrays by their requested IDs."""
+        merged = {}
+        for data in super()._iterate(results):
+            for k, v in data.items():
+                current = merged.get(k)
+                if isinstance(current, list) and isinstance(v, list):
+                    current.extend(v)
+                elif isinstance(current, dict) and isinstance(v, dict):
+                    current.update(v)
+                elif isinstance(v, (list, dict)):
+                    merged[k] = v.copy()
+                elif k not in merged:
+                    merged[k] = v
+
+        order = {str(x): i for i, x in enumerate(self._requested_ids)}
+        key = lambda x: order.get(str(x.get(self._item_key)), len(order))
+        for k, v in merged.items():
+            if isinstance(v, list) and all(isinstance(x, dict) for x in v):
+                v.sort(key=key)
+        return merged
+
+
 class _BasePagedRequest(Request):
 
     # total results parameter key for a related service query
     _total_key = None
 
+    # support speculatively requesting upcoming pages
+    _prefetch = False
+
     def __init__(self, **kw):
         super().__init__(**kw)
 
@@ -172,9 +336,23 @@ class _BasePagedRequest(Request):
 
         # Total number of potential elements to request, some services don't
         # return the number of matching elements so this is optional.
-        # TODO: For services that return total number of matches on the first
-        # request, send the remaining requests asynchronously.
         self._total = None
+        # response data the total can still be pulled from
+        self._total_data = None
+
+    @property
+    def _total(self):
+        # Streamed responses only expose values following their items once
+        # the items are consumed, so look for the total again if needed.
+        if self._total_count is None and self._total_data is not None:
+            self._total_count = self._total_data.get(self._total_key)
+            if self._total_count is not None:
+                self._total_data = None
+        return self._total_count
+
+    @_total.setter
+    def _total(self, value):
+        self._total_count = value
 
     def parse(self, data):
         """Extract the total number of results expected."""
@@ -184,23 +362,130 @@ class _BasePagedRequest(Request):
             # it to be missing.
             if self._total_key is not None:
                 self._total = data.get(self._total_key)
+                if self._total is None:
+                    self._total_data = data
         return super().parse(data)
 
-    def send(self):
+    def send(self, **kw):
         """Send a request object to the related service."""
+        if self._prefetch and self.service.prefetch:
+            yield from self._prefetch_pages(self.service.prefetch, **kw)
+            return
+
         while True:
-            data = self.service.send(self)
+            data = self.service.send(self, **kw)
+            for x in data:
+                self._seen += 1
+                yield x
+
+            # If the total number of results is known, request all remaining
+            # pages concurrently, otherwise keep walking them one at a time.
+            pages = self.remaining_pages()
+            if pages is not None:
+                yield from self._send_pages(pages, **kw)
+                return
+
+            # don't walk further pages once the service is cancelled
+            self.service._check_cancelled()
+            try:
+                self.next_page()
+            except StopIteration:
+                return
+
+    def _send_pages(self, pages, **kw):
+        """Send requests for the given pages in parallel, yielding results in order."""
+        if not pages:
+            return
+        reqs = [self._page_request(params) for params in pages]
+        for data in self.service.send(reqs, **kw):
             for x in data:
                 self._seen += 1
                 yield x
-            self.next_page()
+
+    def _page_request(self, params):
+        """Create a copy of the request targeting a specific page."""
+        req = copy.copy(self)
+        req._req = copy.copy(self._req)
+        req.params = self.params.copy()
+        req.params.update(params)
+        req._finalized = False
+        return req
+
+    def _prefetch_pages(self, depth, **kw):
+        """Send page requests ahead of the consumer, yielding results in order.
+
+        At most depth pages are requested beyond the page currently being
+        consumed and no further pages are requested once iteration stops.
+        """
+        pages = queue.Queue()
+        # one slot for the page being consumed plus the prefetched pages
+        slots = threading.Semaphore(depth + 1)
+        done = threading.Event()
+
+        def _produce():
+            req = self
+            try:
+                while req is not None:
+                    slots.acquire()
+                    if done.is_set():
+                        return
+                    self.service._check_cancelled()
+                    pages.put((req, self.service.send(req, **kw)))
+                    req = self._next_page_request(req)
+            except Exception as e:
+                pages.put(e)
+            else:
+                pages.put(None)
+
+        thread = threading.Thread(target=_produce, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                page = pages.get()
+                if page is None:
+                    return
+                elif isinstance(page, Exception):
+                    raise page
+
+                req, data = page
+                count = 0
+                for x in data:
+                    self._seen += 1
+                    count += 1
+                    yield x
+                slots.release()
+
+                if self._last_page(req, count):
+                    return
+        finally:
+            done.set()
+            slots.release()
+
+    def _next_page_request(self, req):
+        """Return a request for the page following a sent page request.
+
+        Returns None if no more pages exist.
+        """
+        return None
+
+    def _last_page(self, req, count):
+        """Determine if a consumed page was the last one."""
+        return False
+
+    def remaining_pages(self):
+        """Return the params for all remaining pages if they can be determined.
+
+        Returns None when the number of remaining pages isn't known and they
+        have to be requested sequentially.
+        """
+        return None
 
     def next_page(self):
         """Modify a request in order to grab the next page of results."""
         raise StopIteration
 
 
-# TODO: run these asynchronously
 class PagedRequest(_BasePagedRequest):
     """Keep requesting matching records until all relevant results are returned."""
 
@@ -230,6 +515,22 @@ class PagedRequest(_BasePagedRequest):
             self.params[self._size_key] = self.service.max_results
         super()._finalize()
 
+    def remaining_pages(self):
+        if self._total is None:
+            return None
+
+        # no more results exist
+        if not self._seen or self._seen >= self._total:
+            return []
+
+        # use the number of returned results as the page size in case the
+        # service caps it below what was requested
+        size = self._seen
+        page = self.params[self._page_key]
+        return [
+            {self._page_key: x, self._size_key: size}
+            for x in range(page + 1, ceil(self._total / size))]
+
     def next_page(self):
         # if no more results exist, stop requesting them
         if self._total is None or self._seen >= self._total:
@@ -240,10 +541,11 @@ class PagedRequest(_BasePagedRequest):
         self._finalized = False
 
 
-# TODO: run these asynchronously
 class FlaggedPagedRequest(_BasePagedRequest):
     """Keep requesting matching records until all relevant results are returned."""
 
+    _prefetch = True
+
     # page, query size, and total results parameter keys for a related service query
     _page_key = None
     _size_key = None
@@ -273,6 +575,15 @@ class FlaggedPagedRequest(_BasePagedRequest):
             self.params[self._size_key] = self.service.max_results
         super()._finalize()
 
+    def _next_page_request(self, req):
+        if req._exhausted:
+            return None
+        return self._page_request({self._page_key: req.params[self._page_key] + 1})
+
+    def _last_page(self, req, count):
+        # speculatively requested pages end at the first empty page
+        return req._exhausted or not count
+
     def next_page(self):
         if self._exhausted:
             raise StopIteration
@@ -282,7 +593,6 @@ class FlaggedPagedRequest(_BasePagedRequest):
         self._finalized = False
 
 
-# TODO: run these asynchronously
 class OffsetPagedRequest(_BasePagedRequest):
     """Keep requesting matching records until all relevant results are returned."""
 
@@ -303,6 +613,9 @@ class OffsetPagedRequest(_BasePagedRequest):
         if offset is not None:
             self.params[self._offset_key] = offset
 
+        self._limit = limit
+        self._offset = offset if offset is not None else 0
+
         # total number of elements parsed at previous paged request
         self._prev_seen = 0
 
@@ -311,6 +624,24 @@ class OffsetPagedRequest(_BasePagedRequest):
             self.params[self._size_key] = self.service.max_results
         super()._finalize()
 
+    def remaining_pages(self):
+        if self._total is None:
+            return None
+
+        # use the number of returned results as the page size in case the
+        # service caps it below what was requested
+        size = self._seen - self._prev_seen
+        if not size:
+            return []
+
+        start = self._offset + self._seen
+        end = self._total
+        if self._limit is not None:
+            end = min(end, self._offset + self._limit)
+        return [
+            {self._offset_key: x, self._size_key: min(size, end - x)}
+            for x in range(start, end, size)]
+
     def next_page(self):
         seen = self._seen - self._prev_seen
 
@@ -324,10 +655,11 @@ class OffsetPagedRequest(_BasePagedRequest):
         self._finalized = False
 
 
-# TODO: run these asynchronously
 class LinkPagedRequest(_BasePagedRequest):
     """Keep requesting matching records until all relevant result pages are returned."""
 
+    _prefetch = True
+
     # paging related parameter keys for a related service query
     _page = None
     _pagelen = None
@@ -348,6 +680,15 @@ class LinkPagedRequest(_BasePagedRequest):
             self.params[self._pagelen] = self.service.max_results
         super()._finalize()
 
+    def parse_response(self, response):
+        # pull the next page link as soon as the response arrives
+        data = self.service.parse_response(response)
+        self._next_page = data.get(self._next)
+        return data
+
+    def _next_page_request(self, req):
+        return _link_page_request(req)
+
     def next_page(self):
         # no more results exist, stop requesting them
         if self._next_page is None:
@@ -356,16 +697,12 @@ class LinkPagedRequest(_BasePagedRequest):
         # set offset and send new request
         self._req.url = self._next_page
 
-    def parse(self, data):
-        """Parse the data returned from a given request."""
-        self._next_page = data.get(self._next)
-        return super().parse(data)
-
 
-# TODO: run these asynchronously
 class LinkHeaderPagedRequest(_BasePagedRequest):
     """Keep requesting matching records until all relevant result pages are returned."""
 
+    _prefetch = True
+
     # total results response header key
     _pagelen = None
     _total_header = None
@@ -385,6 +722,9 @@ class LinkHeaderPagedRequest(_BasePagedRequest):
         self._next_page = response.links.get('next', {}).get('url')
         return self.service.parse_response(response)
 
+    def _next_page_request(self, req):
+        return _link_page_request(req)
+
     def next_page(self):
         # no more results exist, stop requesting them
         if self._next_page is None:
@@ -394,6 +734,43 @@ class LinkHeaderPagedRequest(_BasePagedRequest):
         self._req.url = self._next_page
 
 
+def _link_page_request(req):
+    """Create a request for the page linked from a sent page request."""
+    if req._next_page is None:
+        return None
+    next_req = copy.copy(req)
+    next_req._req = copy.copy(req._req)
+    next_req._req.url = req._next_page
+    next_req._next_page = None
+    return next_req
+
+
+def send_paged(service, reqs, **kw):
+    """Send paged requests in parallel, returning the results for each request.
+
+    The first pages of all requests are sent together, followed by all their
+    remaining pages when the totals are known. Requests lacking totals only
+    return their first page.
+    """
+    reqs = tuple(reqs)
+    if not reqs:
+        return []
+
+    results = []
+    pages = []
+    for i, (req, data) in enumerate(zip(reqs, service.send(reqs, **kw))):
+        items = list(data)
+        req._seen += len(items)
+        results.append(items)
+        pages.extend((i, req._page_request(x)) for x in req.remaining_pages() or ())
+
+    if pages:
+        page_reqs = [x for _, x in pages]
+        for (i, _), data in zip(pages, service.send(page_reqs, **kw)):
+            results[i].extend(data)
+    return results
+
+
 class ParseRequest(Request):
     """Parse parameters according to defined methods for a request."""
 
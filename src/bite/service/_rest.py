@@ -44,7 +44,8 @@ class RESTRequest(Request):
 
     def params_to_data(self):
         """Convert params to encoded request data."""
-        self.data.update(self.params)
+        # create a new mapping so copied page requests don't share data
+        self.data = {**self.data, **self.params}
         self.params = {}
 
     def _finalize(self):
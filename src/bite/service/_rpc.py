@@ -1,7 +1,12 @@
+from concurrent.futures import Future
 from itertools import repeat, islice
 
+import requests
+
 from . import Service
-from ._reqs import Request
+from ._jobs import cancel_with
+from ._reqs import Request, NullRequest, SplitRequest, _BasePagedRequest
+from ..exceptions import AuthError, ParsingError, RequestError
 from ..utils import nonstring_iterable
 
 
@@ -10,6 +15,11 @@ class Rpc(Service):
     _multicall_method = 'method'
     _multicall_iter = None
 
+    # batch request class if multiple calls can be sent in one HTTP request
+    _batch_cls = None
+    # whether the server accepts batched calls, unknown until the first batch
+    _batching = None
+
     @staticmethod
     def _extract_params(params):
         return params
@@ -24,10 +34,40 @@ class Rpc(Service):
     def merged_multicall(self, *, reqs, **kw):
         return MergedMulticall(reqs=reqs, service=self, **kw)
 
+    def _batchable(self, req):
+        """Determine if a request is a single call that can be sent in a batch."""
+        return (
+            isinstance(req, RPCRequest) and not isinstance(req, (BatchRequest, _BasePagedRequest))
+            and req.service is self and len(req) == 1 and req._raw is None
+            and getattr(req, 'parse_response', None) is None
+            and not (self.stream and req._stream is not None)
+            # chunks of split requests are kept apart to stay within size limits
+            and not (isinstance(req, SplitRequest) and req._chunk))
+
+    def batch(self, reqs):
+        if self._batch_cls is None:
+            return None
+        calls = [x for x in reqs if self._batchable(x)]
+        if len(calls) < 2 or self._batching is False:
+            return None
+        return self._batch_cls(reqs=calls, service=self)
+
+    def _encode_batch(self, reqs):
+        """Encode the data body for a batch of calls."""
+        raise NotImplementedError
+
+    def _decode_batch(self, data, reqs):
+        """Decode the results of a batch of calls, returning them in request order."""
+        raise NotImplementedError
+
 
 class RPCRequest(Request):
     """Construct an RPC request."""
 
+    # Stream paths are relative to the call result rather than the response
+    # document, so one path works for each RPC protocol a service supports.
+    _stream = None
+
     def __init__(self, *, command, **kw):
         super().__init__(method='POST', **kw)
         self.command = command
@@ -68,6 +108,18 @@ class MergedMulticall(RPCRequest):
         self.reqs = reqs
         super().__init__(command='system.multicall', **kw)
 
+    @property
+    def _memoize(self):
+        # merged calls can only share responses if all their calls can
+        return all(
+            x._memoize for x in (self.reqs or ()) if not isinstance(x, NullRequest)) or None
+
+    @property
+    def _retry(self):
+        # merged calls can only be resent if all their calls can
+        return all(
+            x._retry for x in (self.reqs or ()) if not isinstance(x, NullRequest)) or None
+
     def encode_params(self, params=None):
         params = params if params is not None else []
         for req in self.reqs:
@@ -82,3 +134,89 @@ class MergedMulticall(RPCRequest):
         for i, length in enumerate(self.req_groups):
             yield self.reqs[i].parse(islice(data, start, start + length))
             start += length
+
+
+class BatchRequest(RPCRequest):
+    """Construct a request sending multiple calls in a single HTTP request.
+
+    The result of each call is parsed by its related request. If the server
+    rejects the batch, the calls are sent separately and batching is disabled
+    for the service, with services that cache the result doing so for the
+    connection.
+    """
+
+    def __init__(self, *, reqs, **kw):
+        self.reqs = tuple(reqs)
+        super().__init__(command=None, **kw)
+
+    def _finalize(self):
+        self._finalized = True
+        for req in self.reqs:
+            if not req._finalized:
+                req._finalize()
+        self._req.data = self.service._encode_batch(self.reqs)
+
+    def send_batch(self, **kw):
+        """Send the batch, returning the call results or None if unsupported."""
+        if self.service._batching is False:
+            return None
+        try:
+            # the batch can only be resent if all its calls can
+            retry = all(x._retry for x in self.reqs) or None
+            data = self.service._http_send(
+                next(self._requests), memoize=False, retry=retry, **kw)
+            results = self.service._decode_batch(data, self.reqs)
+        except AuthError:
+            raise
+        except (RequestError, ParsingError) as e:
+            # connection failures don't indicate whether batches are supported
+            if isinstance(e.__cause__, requests.exceptions.RequestException):
+                raise
+            results = None
+        supported = results is not None
+        if self.service._batching is not supported:
+            self.service._batching = supported
+        return results
+
+    def job(self, batch_job, i, **kw):
+        """Return a future for the result of a given call.
+
+        If the batch is rejected, the call is submitted to the service's
+        executor so the calls of a rejected batch are sent concurrently.
+        """
+        future = Future()
+
+        def resolve(func, *args):
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        def done(batch_job):
+            if future.cancelled():
+                return
+            if (not batch_job.cancelled() and batch_job.exception() is None
+                    and batch_job.result() is None):
+                # the batch was rejected so the call is sent separately
+                req = self.reqs[i]
+                job = self.service.executor.submit(
+                    self.service._http_send, next(req._requests), memoize=req._memoize,
+                    retry=req._retry, stream=req._stream, **kw)
+                cancel_with(future, job)
+                job.add_done_callback(lambda job: resolve(job.result))
+            else:
+                resolve(self.result, batch_job, i)
+
+        batch_job.add_done_callback(done)
+        cancel_with(future, batch_job)
+        return future
+
+    @staticmethod
+    def result(job, i):
+        """Return the result of a given call from the batch results."""
+        result = job.result()[i]
+        if isinstance(result, Exception):
+            raise result
+        return result
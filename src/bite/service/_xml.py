@@ -1,3 +1,6 @@
+from collections import deque
+from collections.abc import Mapping
+
 from lxml.etree import XMLPullParser, XMLSyntaxError
 from snakeoil.klass import steal_docs
 
@@ -8,6 +11,8 @@ from ..exceptions import ParsingError, RequestError
 class Xml(Service):
     """Support generic services that use XML to communicate."""
 
+    _streaming = True
+
     def __init__(self, **kw):
         super().__init__(**kw)
         self.session.headers.update({
@@ -16,18 +21,31 @@ class Xml(Service):
         })
 
     @steal_docs(Service)
-    def parse_response(self, response):
-        if not response.headers.get('Content-Type', '').startswith('text/xml'):
+    def parse_response(self, response, stream=None):
+        if not response.headers.get('Content-Type', '').startswith(('text/xml', 'application/xml')):
             msg = 'non-XML response from server'
             if not self.verbose:
                 msg += ' (use verbose mode to see it)'
             raise RequestError(
                 msg, code=response.status_code, text=response.text, response=response)
+        if stream is not None:
+            return self._parse_stream(response, stream)
         try:
             return self._parse_xml(response)[0]
         except XMLSyntaxError as e:
             raise ParsingError(msg='failed parsing XML') from e
 
+    def _parse_stream(self, response, path):
+        """Incrementally parse XML data from a response.
+
+        Elements of the array at the given path of tags are unmarshalled and
+        returned as soon as their closing tags are parsed.
+        """
+        if len(path) != 1:
+            raise ValueError(f'unsupported XML stream path: {path!r}')
+        stream = StreamedResponse(self, response, UnmarshallToDict(path))
+        return StreamedStruct(stream, path[0])
+
     def _getparser(self, unmarshaller=None):
         u = unmarshaller if unmarshaller is not None else UnmarshallToDict()
         p = LXMLParser(u)
@@ -90,7 +108,10 @@ class LXMLParser(object):
                 if element.text:
                     self._target.data(element.text)
                 self._target.end(element.tag)
+                # drop parsed elements so the tree doesn't grow with the document
                 element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
 
     def feed(self, data):
         try:
@@ -103,6 +124,226 @@ class LXMLParser(object):
         self._parser.close()
 
 
-# TODO: implement this for XML REST clients
+# fields that are always integers, e.g. item IDs and array paging attributes
+_int_fields = frozenset(('id', 'total_count', 'offset', 'limit'))
+# converters for elements explicitly typed via type attributes
+_typed = {
+    'integer': int,
+    'boolean': lambda x: x == 'true',
+}
+
+
+def _convert(field, value):
+    """Convert the value of a field known to be an integer, otherwise leave it as is."""
+    if field in _int_fields and value.lstrip('-').isdigit():
+        return int(value)
+    return value
+
+
+class _Element(object):
+    """Parsing state of an open XML element."""
+
+    __slots__ = ('path', 'attrs', 'text', 'children', 'array', 'streamed')
+
+    def __init__(self, path, attrs):
+        self.path = path
+        self.attrs = attrs
+        self.text = []
+        self.children = []
+        self.array = attrs.get('type') == 'array'
+        self.streamed = False
+
+
 class UnmarshallToDict(object):
-    pass
+    """Unmarshal XML documents into dicts mirroring their JSON counterparts.
+
+    Elements marked with a type="array" attribute become lists of their
+    children's values, other elements with children become dicts keyed by
+    child tag with repeated tags collected into lists. Attributes are added to
+    their element's dict, any text of an element with attributes is stored
+    under the 'value' key, and childless elements become their text or None
+    if empty. The document is returned as a dict mapping the root tag to its
+    value with any root attributes of an array alongside, e.g. a Redmine
+    issues list becomes {'issues': [...], 'total_count': 1, ...}.
+
+    Only fields known to be integers such as IDs and paging attributes, and
+    elements typed with type="integer" or type="boolean" attributes are
+    converted, matching how they're encoded in JSON. All other text is left as
+    strings since there's no way to tell a version or title like "1.10" apart
+    from a number.
+
+    If a path of tags is given, completed children of the array found there
+    are queued in the items attribute instead of being added to the array.
+    """
+
+    def __init__(self, path=None):
+        self._path = tuple(path) if path is not None else None
+        self._stack = []
+        self._value = None
+        self.items = deque()
+        self.done = False
+
+    def start(self, tag, attrs):
+        path = self._stack[-1].path + (tag,) if self._stack else (tag,)
+        element = _Element(path, dict(attrs))
+        if element.array and not self.done and path == self._path:
+            element.streamed = True
+        self._stack.append(element)
+
+    def data(self, text):
+        self._stack[-1].text.append(text)
+
+    def end(self, tag):
+        element = self._stack.pop()
+        value = self._unmarshal(element)
+        if element.streamed:
+            self.done = True
+        if self._stack:
+            parent = self._stack[-1]
+            if parent.streamed:
+                self.items.append(value)
+            else:
+                parent.children.append((tag, value))
+        else:
+            self._value = {tag: value}
+            if element.array:
+                self._value.update(self._attrs(element))
+
+    @staticmethod
+    def _attrs(element):
+        attrs = element.attrs
+        if not attrs:
+            return {}
+        if element.array:
+            attrs = {k: v for k, v in attrs.items() if k != 'type'}
+        return {k: _convert(k, v) for k, v in attrs.items()}
+
+    def _unmarshal(self, element):
+        if element.array:
+            return [v for _tag, v in element.children]
+        elif not (element.children or element.attrs):
+            # leaf elements are by far the most common
+            text = ''.join(element.text)
+            return _convert(element.path[-1], text) if text else None
+        elif not element.children and element.attrs.keys() == {'type'}:
+            text = ''.join(element.text)
+            convert = _typed.get(element.attrs['type'])
+            if convert is not None:
+                return convert(text) if text else None
+
+        d = self._attrs(element)
+        if element.children:
+            repeated = set()
+            for tag, v in element.children:
+                if tag in repeated:
+                    d[tag].append(v)
+                elif tag in d:
+                    d[tag] = [d[tag], v]
+                    repeated.add(tag)
+                else:
+                    d[tag] = v
+            return d
+
+        text = ''.join(element.text)
+        if d:
+            if text:
+                d['value'] = text
+            return d
+        return text or None
+
+    def close(self):
+        if self._value is None:
+            raise ParsingError(msg='failed parsing XML', text='no document element')
+        return (self._value,)
+
+
+class StreamedResponse(object):
+    """Incrementally parse an XML response as its items are requested.
+
+    The given unmarshaller queues the elements of the streamed array in its
+    items attribute, setting its done attribute once the array is closed.
+    """
+
+    def __init__(self, service, response, unmarshaller):
+        self._service = service
+        self._chunks = response.iter_content(chunk_size=64 * 1024)
+        self._u = unmarshaller
+        self._parser = LXMLParser(self._u)
+        self.value = None
+        self.done = False
+
+    def _feed(self):
+        """Parse the next chunk of the response."""
+        try:
+            chunk = next(self._chunks, b'')
+            if chunk:
+                self._parser.feed(chunk)
+            else:
+                self._parser.close()
+                self.value = self._u.close()[0]
+                self.done = True
+        except XMLSyntaxError as e:
+            raise ParsingError(msg='failed parsing XML') from e
+
+    def drain(self):
+        """Parse the remainder of the response."""
+        while not self.done:
+            self._feed()
+
+    @property
+    def consumed(self):
+        """Whether all streamed items have been returned."""
+        return self.done or (self._u.done and not self._u.items)
+
+    def __iter__(self):
+        items = self._u.items
+        while True:
+            if items:
+                yield items.popleft()
+            elif self._u.done or self.done:
+                return
+            else:
+                self._feed()
+
+
+class StreamedStruct(Mapping):
+    """Top-level mapping of a streamed XML response.
+
+    The array for the first key in the streamed path is returned lazily.
+    Other members are available once the response is parsed, with membership
+    tests and get() not forcing the response to be parsed until the streamed
+    items have been consumed.
+    """
+
+    def __init__(self, stream, key):
+        self._stream = stream
+        self._key = key
+
+    def __getitem__(self, key):
+        if key == self._key:
+            return self._stream
+        self._stream.drain()
+        return self._stream.value[key]
+
+    def _lookup(self, key, default=None):
+        if key == self._key:
+            return self._stream
+        if self._stream.consumed:
+            self._stream.drain()
+        if self._stream.done:
+            return self._stream.value.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        return self._lookup(key, self) is not self
+
+    def get(self, key, default=None):
+        return self._lookup(key, default)
+
+    def __iter__(self):
+        self._stream.drain()
+        return iter(self._stream.value)
+
+    def __len__(self):
+        self._stream.drain()
+        return len(self._stream.value)
@@ -1,10 +1,11 @@
+from collections import deque
 from xmlrpc.client import dumps, loads, Unmarshaller, Fault, ResponseError
 
 from snakeoil.klass import steal_docs
 
 from . import Service
 from ._rpc import Rpc
-from ._xml import Xml
+from ._xml import Xml, StreamedResponse, StreamedStruct
 from ..exceptions import ParsingError, RequestError
 
 
@@ -24,6 +25,69 @@ class _Unmarshaller(Unmarshaller):
     dispatch["name"] = end_string # struct keys are always strings
 
 
+class _StreamingUnmarshaller(_Unmarshaller):
+    """Unmarshaller moving the elements of a given array out as they're completed.
+
+    The array is specified by the path of struct member names leading to it
+    from the top-level response value, an empty path denoting a top-level
+    array. Completed elements are queued in the items attribute instead of
+    being added to the array.
+    """
+
+    dispatch = _Unmarshaller.dispatch
+
+    def __init__(self, path, **kw):
+        super().__init__(**kw)
+        self._path = tuple(path)
+        # open arrays and structs with their related struct member names
+        self._containers = []
+        self._stream_depth = None
+        self._stream_mark = None
+        self.items = deque()
+        self.done = False
+
+    def start(self, tag, attrs):
+        if tag not in ('array', 'struct'):
+            return super().start(tag, attrs)
+
+        path = ()
+        if self._containers:
+            key = self._stack[-1] if self._containers[-1][0] == 'struct' else None
+            path = tuple(k for _tag, k in self._containers[1:]) + (key,)
+        self._containers.append((tag, path[-1] if path else None))
+        super().start(tag, attrs)
+
+        if tag == 'array' and not self.done and self._stream_depth is None and path == self._path:
+            self._stream_depth = len(self._marks)
+            self._stream_mark = self._marks[-1]
+
+    def end(self, tag):
+        super().end(tag)
+        if tag in ('array', 'struct'):
+            self._containers.pop()
+
+        if self._stream_depth is not None:
+            if len(self._marks) < self._stream_depth:
+                # streamed array is closed
+                self._stream_depth = None
+                self.done = True
+            elif len(self._marks) == self._stream_depth and len(self._stack) > self._stream_mark:
+                self.items.extend(self._stack[self._stream_mark:])
+                del self._stack[self._stream_mark:]
+
+
+class _StreamedResponse(StreamedResponse):
+    """Incrementally parse an XML-RPC response as its items are requested."""
+
+    def _feed(self):
+        try:
+            super()._feed()
+        except Fault as e:
+            raise self._service._service_error_cls(msg=e.faultString, code=e.faultCode)
+        except ResponseError as e:
+            raise ParsingError(msg='failed parsing XML') from e
+
+
 class MulticallIterator(object):
     """Iterate over the results of a multicall.
 
@@ -31,23 +95,18 @@ class MulticallIterator(object):
     """
 
     def __init__(self, results, service):
-        self.results = tuple(results)
+        self.results = iter(results)
         self.service = service
-        self.idx = 0
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        try:
-            item = self.results[self.idx]
-        except IndexError:
-            raise StopIteration
+        item = next(self.results)
 
         if isinstance(item, dict):
             self.handle_error(item)
         elif isinstance(item, list):
-            self.idx += 1
             return item[0]
         else:
             raise TypeError(f"unexpected multicall result: {item!r}")
@@ -95,9 +154,9 @@ class Xmlrpc(Xml, Rpc):
         return (params,) if params is not None else ()
 
     @steal_docs(Service)
-    def parse_response(self, response):
+    def parse_response(self, response, **kw):
         try:
-            data = super().parse_response(response)
+            data = super().parse_response(response, **kw)
         except Fault as e:
             raise self._service_error_cls(msg=e.faultString, code=e.faultCode)
         except ResponseError as e:
@@ -113,6 +172,47 @@ class Xmlrpc(Xml, Rpc):
         else:
             self.handle_error(code=faults[0]['faultCode'], msg=faults[0]['faultString'])
 
+    @steal_docs(Rpc)
+    def _encode_batch(self, reqs):
+        calls = []
+        for req in reqs:
+            params, method = loads(req._req.data, use_datetime=True)
+            calls.append({self._multicall_method: method, 'params': params})
+        return self._encode_request('system.multicall', self._encode_params(tuple(calls)))
+
+    @steal_docs(Rpc)
+    def _decode_batch(self, data, reqs):
+        if not isinstance(data, list) or len(data) != len(reqs):
+            return None
+
+        results = []
+        for item in data:
+            if isinstance(item, list) and len(item) == 1:
+                results.append(item[0])
+            elif isinstance(item, dict) and 'faultCode' in item:
+                try:
+                    self.handle_error(code=item['faultCode'], msg=item['faultString'])
+                except Exception as e:
+                    item = e
+                results.append(item)
+            else:
+                return None
+        return results
+
     def _getparser(self, unmarshaller=None):
         u = _Unmarshaller(use_datetime=True) if unmarshaller is None else unmarshaller
         return super()._getparser(unmarshaller=u)
+
+    def _parse_stream(self, response, path):
+        """Incrementally parse an XML-RPC response.
+
+        Elements of the array at the given path are unmarshalled and returned
+        as soon as their closing tags are parsed.
+        """
+        u = _StreamingUnmarshaller(path, use_datetime=True)
+        stream = _StreamedResponse(self, response, u)
+        if not path:
+            return stream
+        if len(path) > 1:
+            raise ValueError(f'unsupported XML-RPC stream path: {path!r}')
+        return StreamedStruct(stream, path[0])
@@ -7,6 +7,7 @@ API docs:
 """
 
 import html
+from itertools import islice
 import re
 
 from dateutil.parser import parse as dateparse
@@ -19,6 +20,7 @@ from ._reqs import (
     BaseCommentsRequest, BaseChangesRequest,
 )
 from ._rest import RESTRequest, RESTParseRequest
+from ..cache import Cache, csv2tuple, iter2csv
 from ..exceptions import BiteError, RequestError
 from ..objects import Item, Comment, Attachment, Change
 from ..utc import utc
@@ -32,6 +34,42 @@ class AlluraError(RequestError):
         super().__init__(msg, code, text)
 
 
+def thread_map(s):
+    """Convert cached ID:thread ID pairs into a mapping."""
+    return {int(k): v for k, v in (x.split(':', 1) for x in csv2tuple(s) if x)}
+
+
+def thread_csv(d):
+    """Convert an ID to thread ID mapping into cached ID:thread ID pairs."""
+    # keep the mapping order so the least recently found IDs are pruned first
+    return iter2csv(f'{k}:{v}' for k, v in d.items())
+
+
+def thread_id(ticket):
+    """Get the discussion thread ID of ticket data."""
+    try:
+        return ticket['discussion_thread']['_id']
+    except KeyError:
+        # search results don't include discussion thread objects
+        return ticket['discussion_thread_url'].rstrip('/').rsplit('/', 1)[1]
+
+
+class AlluraCache(Cache):
+
+    def __init__(self, **kw):
+        # default to empty values
+        defaults = {
+            'thread_ids': {},
+        }
+
+        converters = {
+            'thread_ids': thread_map,
+        }
+
+        super().__init__(defaults=defaults, converters=converters, **kw)
+        self.converters['write']['dict'] = thread_csv
+
+
 class AlluraTicket(Item):
 
     attributes = {
@@ -98,12 +136,8 @@ class AlluraTicket(Item):
                 v = html.unescape(v)
             setattr(self, k, v)
 
-        # Store comment thread ID, note that search results don't include
-        # discussion thread objects, so fall back to grabbing the value from the URL.
-        if 'discussion_thread' in kw:
-            self.thread_id = kw['discussion_thread']['_id']
-        else:
-            self.thread_id = kw['discussion_thread_url'].rstrip('/').rsplit('/', 1)[1]
+        # store comment thread ID
+        self.thread_id = thread_id(kw)
 
         if get_desc:
             try:
@@ -196,10 +230,14 @@ class Allura(JsonREST):
 
     _service = 'allura'
     _service_error_cls = AlluraError
+    _cache_cls = AlluraCache
 
     item = AlluraTicket
     item_endpoint = '/{id}'
 
+    # maximum number of item thread IDs kept in the cache
+    _max_thread_ids = 1000
+
     def __init__(self, base, max_results=None, **kw):
         try:
             api_base, project = base.split('/p/', 1)
@@ -221,12 +259,37 @@ class Allura(JsonREST):
         super().__init__(
             endpoint=endpoint, base=api_base, max_results=max_results, **kw)
         self.webbase = base
+        self._thread_ids_changed = False
+
+    def _add_thread_ids(self, items):
+        """Remember the thread IDs of items to avoid future lookups.
+
+        Thread IDs never change, but only the most recently found ones are
+        kept to bound the cache size.
+        """
+        thread_ids = self.cache['thread_ids']
+        for item in items:
+            if thread_ids.pop(item.ticket_num, None) is None:
+                self._thread_ids_changed = True
+            thread_ids[item.ticket_num] = item.thread_id
+        for k in list(islice(thread_ids, max(0, len(thread_ids) - self._max_thread_ids))):
+            del thread_ids[k]
+
+    def _cache_thread_ids(self):
+        """Save newly found item thread IDs to the cache."""
+        if self._thread_ids_changed:
+            self._thread_ids_changed = False
+            try:
+                self.cache.write()
+            except IOError:
+                # thread IDs are looked up again next time
+                pass
 
     def inject_auth(self, request, params):
         raise NotImplementedError
 
-    def parse_response(self, response):
-        data = super().parse_response(response)
+    def parse_response(self, response, **kw):
+        data = super().parse_response(response, **kw)
         if data.get('type') != 'error':
             return data
         else:
@@ -258,6 +321,8 @@ class _SearchRequest(RESTParseRequest, AlluraPagedRequest):
         http://yonik.com/solr/
     """
 
+    _stream = ('tickets',)
+
     # map from standardized kwargs name to expected service parameter name
     _params_map = {
         'created': 'created_date',
@@ -410,10 +475,14 @@ class _ThreadRequest(Request):
 
         # pull thread IDs from items
         if item_id:
-            self.service.client.progress_output('Determining message thread IDs')
             self.options.append(f"IDs: {', '.join(map(str, ids))}")
-            items = self.service.SearchRequest(id=ids).send()
-            ids = [x.thread_id for x in items]
+            thread_ids = self.service.cache['thread_ids']
+            missing = [x for x in ids if x not in thread_ids]
+            if missing:
+                self.service.client.progress_output('Determining message thread IDs')
+                self.service._add_thread_ids(self.service.SearchRequest(id=missing).send())
+                self.service._cache_thread_ids()
+            ids = [thread_ids[x] for x in ids if x in thread_ids]
 
         if data is None:
             reqs = []
@@ -475,37 +544,31 @@ class _GetRequest(_GetItemRequest):
         self._get_attachments = get_attachments
         self._get_changes = get_changes
 
-    def parse(self, data):
-        items = list(super().parse(data))
-        comments = self._none_gen
-        attachments = self._none_gen
-        changes = self._none_gen
-
+    def _followup(self, data):
+        # request the discussion thread as soon as the related item is received
         if any((self._get_comments, self._get_attachments, self._get_changes)):
-            # request discussion thread data
-            thread_ids = [x.thread_id for x in items]
-            thread_req = _ThreadRequest(service=self.service, ids=thread_ids)
-            threads = list(thread_req.send())
-            if self._get_comments:
-                item_descs = ((x.description,) for x in items)
-                item_comments = self.service.CommentsRequest(
-                    ids=thread_ids, data=threads).send()
-                comments = (x + y for x, y in zip(item_descs, item_comments))
-            if self._get_attachments:
-                item_initial_attachments = (x.attachments for x in items)
-                post_attachments = self.service.AttachmentsRequest(
-                    ids=thread_ids, data=threads).send()
-                attachments = (
-                    x + y for x, y in zip(item_initial_attachments, post_attachments))
-            if self._get_changes:
-                changes = self.service.ChangesRequest(
-                    ids=thread_ids, data=threads).send()
+            ids = [thread_id(data['ticket'])]
+            return self.service.send([_ThreadRequest(service=self.service, ids=ids)])
+        return None
 
-        for item in items:
-            item.comments = next(comments)
-            item.attachments = next(attachments)
-            item.changes = next(changes)
+    def parse(self, data):
+        for item, thread in data:
+            item = next(super().parse([item]))
+            self.service._add_thread_ids([item])
+            if thread is not None:
+                threads = list(next(thread))
+                ids = [item.thread_id]
+                if self._get_comments:
+                    comments = self.service.CommentsRequest(ids=ids, data=threads).send()
+                    item.comments = (item.description,) + next(comments)
+                if self._get_attachments:
+                    attachments = self.service.AttachmentsRequest(ids=ids, data=threads).send()
+                    item.attachments += next(attachments)
+                if self._get_changes:
+                    changes = self.service.ChangesRequest(ids=ids, data=threads).send()
+                    item.changes = next(changes)
             yield item
+        self.service._cache_thread_ids()
 
     def handle_exception(self, e):
         # TODO: move this to data iterator for various obj parsers
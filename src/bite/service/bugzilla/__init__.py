@@ -12,6 +12,7 @@ from .objects import BugzillaBug, BugzillaAttachment
 from .. import Service
 from ...cache import Cache, csv2tuple
 from ...exceptions import RequestError, AuthError
+from ...utils import str2bool
 
 demandload('textwrap')
 
@@ -36,6 +37,7 @@ class BugzillaCache(Cache):
         converters = {
             'open_status': csv2tuple,
             'closed_status': csv2tuple,
+            'multicall': str2bool,
         }
 
         super().__init__(defaults=defaults, converters=converters, **kw)
@@ -52,6 +54,10 @@ class Bugzilla(Service):
     attachment = BugzillaAttachment
     attachment_endpoint = '/attachment.cgi?id={id}'
 
+    # stay under the default URL and request body limits of common web servers
+    _max_url_length = 8000
+    _max_body_size = 1024 * 1024
+
     def __init__(self, max_results=None, **kw):
         # most bugzilla instances default to 10k results per req
         if max_results is None:
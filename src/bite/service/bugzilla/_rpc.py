@@ -5,7 +5,7 @@ from .reqs import (
     AttachRequest, CreateRequest, ExtensionsRequest, VersionRequest, FieldsRequest,
     ProductsRequest, UsersRequest,
 )
-from .._reqs import req_cmd
+from .._reqs import SplitRequest, req_cmd
 from .._rpc import RPCRequest
 
 
@@ -29,66 +29,103 @@ class _LoginRequest(LoginRequest, RPCRequest):
 
 @req_cmd(Bugzilla4_4Rpc, cmd='users')
 class _UsersRequest(UsersRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='User.get', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='fields')
 class _FieldsRequest(FieldsRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bug.fields', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='products')
 class _ProductsRequest(ProductsRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Product.get', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='extensions')
 class _ExtensionsRequest(ExtensionsRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bugzilla.extensions', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='version')
 class _VersionRequest(VersionRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bugzilla.version', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='search')
 class _SearchRequest4_4(SearchRequest4_4, RPCRequest):
+
+    _retry = True
+    # used by both the XML-RPC and JSON-RPC services
+    _stream = ('bugs',)
+
     def __init__(self, **kw):
         super().__init__(command='Bug.search', **kw)
 
 
 @req_cmd(Bugzilla5_0Rpc, cmd='search')
 class _SearchRequest5_0(SearchRequest5_0, RPCRequest):
+
+    _retry = True
+    # used by both the XML-RPC and JSON-RPC services
+    _stream = ('bugs',)
+
     def __init__(self, **kw):
         super().__init__(command='Bug.search', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='changes')
-class _ChangesRequest(ChangesRequest, RPCRequest):
+class _ChangesRequest(ChangesRequest, SplitRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bug.history', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='comments')
-class _CommentsRequest(CommentsRequest, RPCRequest):
+class _CommentsRequest(CommentsRequest, SplitRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bug.comments', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc, cmd='attachments')
-class _AttachmentsRequest(AttachmentsRequest, RPCRequest):
+class _AttachmentsRequest(AttachmentsRequest, SplitRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bug.attachments', **kw)
 
 
 @req_cmd(Bugzilla4_4Rpc)
 class _GetItemRequest(GetItemRequest, RPCRequest):
+
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='Bug.get', **kw)
         # return array of faults for bad bugs instead of directly failing out
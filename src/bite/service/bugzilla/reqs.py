@@ -8,7 +8,7 @@ from snakeoil.klass import aliased, alias
 from . import Bugzilla
 from .objects import BugzillaEvent, BugzillaComment
 from .._reqs import (
-    OffsetPagedRequest, Request, ParseRequest, req_cmd,
+    OffsetPagedRequest, Request, ParseRequest, SplitRequest, req_cmd,
     BaseGetRequest, BaseCommentsRequest, BaseChangesRequest,
 )
 from ...exceptions import BiteError
@@ -629,7 +629,7 @@ class CreateRequest(ParseRequest):
             self.params[k] = v
 
 
-class GetItemRequest(Request):
+class GetItemRequest(SplitRequest):
     """Construct an item retrieval request."""
 
     def __init__(self, ids, fields=None, **kw):
@@ -19,8 +19,8 @@ class _BugzillaRestBase(Bugzilla5_0, JsonREST):
     def __init__(self, **kw):
         super().__init__(endpoint='/rest', **kw)
 
-    def parse_response(self, response):
-        data = super().parse_response(response)
+    def parse_response(self, response, **kw):
+        data = super().parse_response(response, **kw)
         if 'error' not in data:
             return data
         else:
@@ -45,6 +45,9 @@ class Bugzilla5_2Rest(Bugzilla5_0Rest, Bugzilla5_2):
 
 @req_cmd(Bugzilla5_0Rest, cmd='modify', obj_args=True)
 class _ModifyRequest(ModifyRequest, RESTRequest):
+    # resending a modification that was applied would duplicate its comment
+    _retry = False
+
     def __init__(self, **kw):
         super().__init__(endpoint='/bug', method='PUT', **kw)
         self.endpoint = f"/bug/{self.params['ids'][0]}"
@@ -79,6 +82,8 @@ class _CreateRequest(CreateRequest, RESTRequest):
 
 @req_cmd(Bugzilla5_0Rest, cmd='search')
 class _SearchRequest5_0(SearchRequest5_0, RESTRequest):
+    _stream = ('bugs',)
+
     def __init__(self, **kw):
         super().__init__(endpoint='/bug', **kw)
 
@@ -113,6 +118,9 @@ class _AttachmentsRequest(AttachmentsRequest, RESTRequest):
 
 @req_cmd(Bugzilla5_0Rest)
 class _GetItemRequest(GetItemRequest, RESTRequest):
+
+    _ids_key = 'id'
+
     def __init__(self, **kw):
         super().__init__(endpoint='/bug', method='GET', **kw)
         # REST interface renames 'ids' param to 'id'
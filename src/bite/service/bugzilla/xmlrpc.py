@@ -1,18 +1,71 @@
 """Support Bugzilla's deprecated XML-RPC interface."""
 
+import requests
+
 from . import BugzillaAttachment
 from ._rpc import Bugzilla4_4Rpc, Bugzilla5_0Rpc, Bugzilla5_2Rpc
+from .._rpc import BatchRequest, RPCRequest
 from .._xmlrpc import Xmlrpc
+from ...exceptions import ParsingError, RequestError
 from ...objects import decompress
 
 
 class _BugzillaXmlrpcBase(Xmlrpc):
-    """Base service class for Bugzilla XML-RPC interface."""
+    """Base service class for Bugzilla XML-RPC interface.
+
+    Calls sent together, e.g. the separate calls for bug data, comments,
+    attachments, and history when getting bugs, are merged into a single
+    system.multicall request if the server advertises it.
+    """
+
+    _batch_cls = BatchRequest
 
     def __init__(self, **kw):
         super().__init__(endpoint='/xmlrpc.cgi', **kw)
         self.attachment = BugzillaAttachmentXml
 
+    @property
+    def cache_updates(self):
+        config_updates = super().cache_updates
+        multicall = self._probe_multicall()
+        if multicall is not None:
+            config_updates['multicall'] = multicall
+        return config_updates
+
+    def _probe_multicall(self):
+        """Determine if the server supports system.multicall.
+
+        Returns None if the server couldn't be queried.
+        """
+        try:
+            methods = self.send(RPCRequest(service=self, command='system.listMethods'))
+        except (RequestError, ParsingError) as e:
+            if isinstance(e.__cause__, requests.exceptions.RequestException):
+                return None
+            # introspection isn't supported
+            return False
+        return isinstance(methods, list) and 'system.multicall' in methods
+
+    @property
+    def _batching(self):
+        """Whether system.multicall is supported, probed once per connection."""
+        multicall = self.cache.get('multicall')
+        if multicall is None:
+            multicall = self._probe_multicall()
+            if multicall is None:
+                return False
+            self._batching = multicall
+        return multicall
+
+    @_batching.setter
+    def _batching(self, multicall):
+        self.cache['multicall'] = multicall
+        try:
+            self.cache.write()
+        except IOError:
+            # the probe is run again next time
+            pass
+
 
 class Bugzilla4_4Xmlrpc(_BugzillaXmlrpcBase, Bugzilla4_4Rpc):
     """Service for Bugzilla 4.4 XML-RPC interface.
@@ -5,6 +5,7 @@ API docs:
     - https://docs.atlassian.com/jira/REST/server/
 """
 
+from collections import deque
 import re
 
 from dateutil.parser import parse as parsetime
@@ -13,7 +14,7 @@ from snakeoil.klass import aliased, alias
 from ._jsonrest import JsonREST
 from ._reqs import (
     OffsetPagedRequest, req_cmd, BaseCommentsRequest, BaseChangesRequest,
-    NullRequest, Request
+    NullRequest, Request, send_paged
 )
 from ._rest import RESTRequest, RESTParseRequest
 from ..exceptions import BiteError, RequestError
@@ -111,19 +112,29 @@ class JiraComment(Comment):
 class JiraAttachment(Attachment):
 
     @classmethod
-    def parse(cls, data):
+    def parse(cls, data, content=None):
         l = []
         for a in data:
             l.append(cls(
                 id=a['id'], creator=a['author']['name'],
                 created=parsetime(a['created']), size=a['size'],
                 filename=a['filename'], mimetype=a['mimeType'],
-                url=a['content']))
+                url=a['content'], data=next(content) if content is not None else None))
         return tuple(l)
 
 
 class JiraEvent(Change):
-    pass
+
+    @classmethod
+    def parse(cls, data):
+        l = []
+        for i, c in enumerate(data, start=1):
+            changes = {x['field']: (x.get('fromString'), x.get('toString')) for x in c['items']}
+            creator = c.get('author', {}).get('name')
+            l.append(cls(
+                id=c['id'], count=i, creator=creator,
+                created=parsetime(c['created']), changes=changes))
+        return tuple(l)
 
 
 class Jira(JsonREST):
@@ -173,11 +184,18 @@ class Jira(JsonREST):
                 i = id
             yield url.format(id=i)
 
+    def _issue_key(self, id):
+        """Convert an issue ID to its project issue key."""
+        id = str(id)
+        if re.match(r'\d+', id) and self.project:
+            id = f'{self.project}-{id}'
+        return id.upper()
+
     def inject_auth(self, request, params):
         raise NotImplementedError
 
-    def parse_response(self, response):
-        data = super().parse_response(response)
+    def parse_response(self, response, **kw):
+        data = super().parse_response(response, **kw)
         if 'errorMessages' not in data:
             return data
         else:
@@ -195,6 +213,11 @@ class JiraPagedRequest(OffsetPagedRequest, RESTRequest):
 class _SearchRequest(RESTParseRequest, JiraPagedRequest):
     """Construct a search request."""
 
+    _stream = ('issues',)
+
+    # extra parameters passed when creating issue objects
+    _item_params = {}
+
     def __init__(self, **kw):
         # use POST requests to avoid URL length issues with massive JQL queries
         super().__init__(endpoint='/search', method='POST', **kw)
@@ -211,7 +234,7 @@ class _SearchRequest(RESTParseRequest, JiraPagedRequest):
                 # if configured for a specific project, strip it from the ID
                 id = id[len(self.service.project) + 1:]
             fields = issue.get('fields', {})
-            yield self.service.item(id=id, **fields)
+            yield self.service.item(id=id, **self._item_params, **fields)
 
     @aliased
     class ParamParser(RESTParseRequest.ParamParser):
@@ -315,78 +338,87 @@ class _SearchRequest(RESTParseRequest, JiraPagedRequest):
 
 @req_cmd(Jira, cmd='get')
 class _GetRequest(Request):
-    """Construct an issue request."""
+    """Construct requests to retrieve issues in batches using searches.
+
+    The specified IDs are split into batches of the maximum search page size
+    that are searched for in parallel. Since Jira doesn't support ordering
+    search results by the order of the specified IDs, issues are reordered to
+    match as they're received.
+    """
 
     def __init__(self, ids, get_comments=True, get_attachments=True,
                  get_changes=False, **kw):
         super().__init__(**kw)
-        if ids is None:
+        if not ids:
             raise ValueError(f'No {self.service.item.type} specified')
 
-        self._get_comments = get_comments
-        self._get_attachments = get_attachments
-        self._get_changes = get_changes
         self.ids = list(map(str, ids))
         self.options.append(f"IDs: {', '.join(self.ids)}")
-
-        # enable/disable field retrieval and expansion based on requested fields
-        self.item_params = {}
-        params = {}
-        expand = []
-        fields = ['*all']
-        for attr, field in (('get_comments', 'comment'),
-                            ('get_changes', 'changelog'),
-                            ('get_attachments', 'attachment')):
-            enabled = getattr(self, f'_{attr}')
-            self.item_params[attr] = enabled
-            if enabled:
-                expand.append(field)
-            else:
-                fields.append(f'-{field}')
-
-        params['expand'] = expand
-        params['fields'] = fields
-
-        reqs = []
-        for i in self.ids:
-            if re.match(r'\d+', i) and self.service.project:
-                id_key = f'{self.service.project}-{i}'
-            else:
-                id_key = i
-            endpoint = f'{self.service._base}/issue/{id_key}'
-            reqs.append(RESTRequest(service=self.service, endpoint=endpoint, params=params))
-        self._reqs = tuple(reqs)
-
-    def parse(self, data):
-        data = super().parse(data)
-        for issue in data:
-            # Use project ID key for issue id, the regular id field relates to
-            # the global issue ID across all projects on the service instance.
-            # Using the key value matches what is shown on the web interface.
-            id = issue.get('key')
-            if self.service.project:
-                # if configured for a specific project, strip it from the ID
-                id = id[len(self.service.project) + 1:]
-            fields = issue.get('fields', {})
-            yield self.service.item(id=id, **self.item_params, **fields)
+        self._keys = [self.service._issue_key(x) for x in self.ids]
+
+        size = self.service.max_results
+        self._reqs = tuple(
+            _SearchGetItemRequest(
+                service=self.service, ids=self.ids[i:i + size], get_comments=get_comments,
+                get_attachments=get_attachments, get_changes=get_changes)
+            for i in range(0, len(self.ids), size))
+
+    def send(self, **kw):
+        issues = {}
+        pending = deque(self._keys)
+
+        def ready():
+            while pending and pending[0] in issues:
+                yield issues[pending.popleft()]
+
+        # send the first page of each batch in parallel
+        pages = []
+        for req, items in zip(self._reqs, self.service.send(self._reqs, **kw)):
+            for item in items:
+                req._seen += 1
+                issues[self.service._issue_key(item.id)] = item
+            yield from ready()
+            # request any matches the service capped from the page
+            pages.extend(req._page_request(x) for x in req.remaining_pages())
+
+        if pages:
+            for items in self.service.send(pages, **kw):
+                for item in items:
+                    issues[self.service._issue_key(item.id)] = item
+                yield from ready()
+
+        # skip missing issues, issues that moved are returned under their new keys
+        for key in pending:
+            if key in issues:
+                yield issues[key]
+        keys = set(self._keys)
+        yield from (v for k, v in issues.items() if k not in keys)
 
 
 class _SearchGetItemRequest(_SearchRequest):
     """Construct an issue request using a search request.
 
     Note that the returned items are not in the same order the specified IDs
-    are in and Jira currently doesn't seem to support ordering them in that fashion.
+    are in and Jira currently doesn't seem to support ordering them in that
+    fashion, use the get request to retrieve issues in order.
     """
 
-    def __init__(self, ids, **kw):
-        if ids is None:
-            raise ValueError(f'No {self.service.item.type} specified')
-
+    def __init__(self, ids, get_comments=True, get_attachments=True,
+                 get_changes=False, **kw):
+        self._get_comments = get_comments
+        self._get_attachments = get_attachments
+        self._get_changes = get_changes
+        self._item_params = {
+            'get_comments': get_comments,
+            'get_attachments': get_attachments,
+            'get_changes': get_changes,
+        }
         super().__init__(id=ids, **kw)
-
-        self.options.append(f"IDs: {', '.join(map(str, ids))}")
         self.ids = list(map(str, ids))
 
+        # request all issues in a single page if possible
+        self.params[self._size_key] = len(self.ids)
+
     class ParamParser(_SearchRequest.ParamParser):
 
         def _finalize(self, **kw):
@@ -404,8 +436,14 @@ class _SearchGetItemRequest(_SearchRequest):
 
             self.params['expand'] = expand
             self.params['fields'] = fields
+            # Only warn about nonexistent keys, by default Jira rejects the
+            # entire query if any of the specified issues don't exist.
+            self.params['validateQuery'] = 'warn'
             super()._finalize(**kw)
 
+        def id(self, k, v):
+            super().id('key', v)
+
 
 @req_cmd(Jira, cmd='comments')
 class _CommentsRequest(BaseCommentsRequest):
@@ -437,36 +475,102 @@ class _CommentsRequest(BaseCommentsRequest):
 
 @req_cmd(Jira, cmd='attachments')
 class _AttachmentsRequest(Request):
-    """Construct an attachments request."""
+    """Construct an attachments request.
+
+    Only attachment metadata is requested for issues, attachment content is
+    downloaded concurrently into temporary files when requested.
+    """
 
-    def __init__(self, ids=None, item_id=False, data=None, **kw):
+    def __init__(self, ids=None, attachment_ids=None, get_data=False, data=None, **kw):
         super().__init__(**kw)
-        if ids is None:
+        if not any((ids, attachment_ids, data is not None)):
             raise ValueError(f'No ID(s) specified')
 
         if data is None:
-            # TODO
-            pass
+            reqs = []
+            for i in ids or ():
+                endpoint = f'/issue/{self.service._issue_key(i)}'
+                reqs.append(RESTRequest(
+                    service=self.service, endpoint=endpoint, params={'fields': 'attachment'}))
+            for i in attachment_ids or ():
+                reqs.append(RESTRequest(service=self.service, endpoint=f'/attachment/{i}'))
         else:
             reqs = [NullRequest()]
 
         self.ids = ids
+        self.attachment_ids = attachment_ids
         self._reqs = tuple(reqs)
         self._data = data
+        self._get_data = get_data
 
     def parse(self, data):
         if self._data is not None:
-            for attachments in self._data:
-                yield JiraAttachment.parse(attachments)
+            attachments = self._data
+        elif self.ids:
+            attachments = [x['fields']['attachment'] for x in data]
         else:
-            # TODO
-            pass
+            # wrap data similar to how an item ID response looks
+            attachments = [tuple(data)]
+
+        content = None
+        if self._get_data:
+            reqs = tuple(
+                _AttachmentDataRequest(service=self.service, url=a['content'])
+                for x in attachments for a in x)
+            if reqs:
+                content = self.service.send(reqs, allow_redirects=True)
+
+        for x in attachments:
+            yield JiraAttachment.parse(x, content=content)
+
+
+class _AttachmentDataRequest(Request):
+    """Construct a request downloading attachment content."""
+
+    _download = True
+
+    def __init__(self, url, **kw):
+        super().__init__(method='GET', url=url, **kw)
+
+
+class _ChangelogRequest(JiraPagedRequest):
+    """Construct a request for an issue's changelog."""
+
+    def __init__(self, id, **kw):
+        super().__init__(endpoint=f'/issue/{id}/changelog', **kw)
+
+    def parse(self, data):
+        data = super().parse(data)
+        yield from data['values']
 
 
 @req_cmd(Jira, cmd='changes')
 class _ChangesRequest(BaseChangesRequest):
-    """Construct a comments request."""
+    """Construct a changes request.
+
+    Changes are pulled from the dedicated changelog endpoint instead of
+    expanding them for entire issues, with all changelog pages for all issues
+    requested in parallel.
+    """
 
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        if not self.ids:
+            raise ValueError(f'No {self.service.item.type} ID(s) specified')
+        self.options.append(f"IDs: {', '.join(self.ids)}")
+
+        self._reqs = tuple(
+            _ChangelogRequest(service=self.service, id=self.service._issue_key(i))
+            for i in self.ids)
+
+    def send(self, **kw):
+        return self.parse(send_paged(self.service, self._reqs, **kw))
+
+    def parse(self, data):
+        def items():
+            for x in data:
+                yield JiraEvent.parse(x)
+        yield from self.filter(items())
 
 
 @req_cmd(Jira, cmd='version')
@@ -5,6 +5,8 @@ API docs:
     https://help.launchpad.net/API/Hacking
 """
 
+from itertools import chain
+
 from dateutil.parser import parse as dateparse
 from snakeoil.klass import aliased, alias
 
@@ -129,6 +131,8 @@ class _SearchRequest(RESTParseRequest, LaunchpadPagedRequest):
     for custom GET methods.
     """
 
+    _stream = ('entries',)
+
     # map from standardized kwargs name to expected service parameter name
     _params_map = {
         'sort': 'order_by',
@@ -395,22 +399,25 @@ class _AttachmentsRequest(Request):
         self._reqs = tuple(reqs)
         self._get_data = get_data
 
+    def _followup(self, data):
+        # request attachment content as soon as the related metadata is received
+        if not self._get_data:
+            return self._none_gen
+        attachments = data['entries'] if self.ids else (data,)
+        reqs = [
+            Request(service=self.service, method='GET', url=x['data_link'], raw=True)
+            for x in attachments]
+        return self.service.send(reqs, allow_redirects=True)
+
     def parse(self, data):
         # wrap data similar to how an item ID response looks
         if self.attachment_ids:
-            data = [tuple(data)]
+            data = tuple(data)
+            data = [(tuple(x for x, _ in data), chain.from_iterable(x for _, x in data))]
 
-        for attachments in data:
+        for attachments, content in data:
             if self.ids:
                 attachments = attachments['entries']
-            if self._get_data:
-                reqs = tuple(Request(
-                    service=self.service, method='GET', url=x['data_link'], raw=True)
-                    for x in attachments)
-                content = Request(
-                    service=self.service, reqs=reqs, raw=True).send(allow_redirects=True)
-            else:
-                content = self._none_gen
             yield tuple(self.service.attachment(data=c, **a)
                         for a, c in zip(attachments, content))
 
@@ -4,12 +4,13 @@ API docs:
     - https://www.redmine.org/projects/redmine/wiki/Rest_api
 """
 
-from itertools import chain
+from collections import deque
+from itertools import islice
 
 from dateutil.parser import parse as dateparse
 from snakeoil.klass import aliased, alias
 
-from .._reqs import OffsetPagedRequest, Request, req_cmd, BaseCommentsRequest
+from .._reqs import OffsetPagedRequest, SplitRequest, req_cmd, BaseCommentsRequest
 from .._rest import REST, RESTRequest, RESTParseRequest
 from ...exceptions import BiteError, RequestError
 from ...objects import Item, Comment, Attachment, Change
@@ -101,6 +102,11 @@ class Redmine(REST):
     item = RedmineIssue
     item_endpoint = '/issues/{id}'
 
+    # Large issue_id filters cause HTTP 500s due to URL length so requests for
+    # more issues are split up.
+    _max_url_length = 4000
+    _max_ids = 100
+
     def __init__(self, base, max_results=None, **kw):
         try:
             api_base, project = base.split('/projects/', 1)
@@ -136,40 +142,22 @@ class RedminePagedRequest(OffsetPagedRequest, RESTRequest):
 
 
 @req_cmd(Redmine)
-class _GetItemRequest(RESTParseRequest, RedminePagedRequest):
+class _GetItemRequest(RESTParseRequest, SplitRequest, RedminePagedRequest):
     """Construct an issue request."""
 
-    def __init__(self, *, service, ids=None, searchreq=False, get_desc=True,
-                 sliced=False, **kw):
+    _stream = ('issues',)
+    _ids_key = 'issue_id'
+    _ids_sep = ','
+
+    def __init__(self, *, service, ids=None, searchreq=False, get_desc=True, **kw):
         self._ids = list(map(str, ids)) if ids is not None else ids
         if self._ids is not None:
             kw['ids'] = self._ids
         # running as a search request filter
         self._searchreq = searchreq
         self._get_desc = get_desc
-        self._sliced = sliced
         super().__init__(service=service, endpoint=f'/issues.{service._ext}', **kw)
 
-    def send(self, **kw):
-        # Slice request into pieces if it gets too long otherwise we get
-        # HTTP 500s due to URL length. Note that this means sorting won't
-        # work for large queries.
-        if self._ids and len(self._ids) > 100:
-            ids = list(self._ids)
-            reqs = []
-            while ids:
-                req = self.__class__(service=self.service, get_desc=self._get_desc, sliced=True)
-                req.params = dict(self.params)
-                req.params['issue_id'] = ','.join(ids[:100])
-                reqs.append(req)
-                ids = ids[100:]
-            combined_req = Request(service=self.service, reqs=reqs)
-            items = chain.from_iterable(combined_req.send(**kw))
-        else:
-            items = super().send(**kw)
-
-        return items
-
     def parse(self, data):
         issues = data['issues']
         for issue in issues:
@@ -195,7 +183,7 @@ class _GetItemRequest(RESTParseRequest, RedminePagedRequest):
         }
 
         def _finalize(self, **kw):
-            if not any((self.params, self.request._sliced, self.request._searchreq)):
+            if not any((self.params, self.request._searchreq)):
                 raise BiteError('no supported options specified')
 
             # return all non-closed issues by default
@@ -210,8 +198,8 @@ class _GetItemRequest(RESTParseRequest, RedminePagedRequest):
                 self.params['sort'] = 'id'
 
         def ids(self, k, v):
-            self.params['issue_id'] = ','.join(v)
-            self.options.append(f"IDs: {', '.join(v)}")
+            self.params['issue_id'] = ','.join(map(str, v))
+            self.options.append(f"IDs: {', '.join(map(str, v))}")
 
         def sort(self, k, v):
             sorting_terms = []
@@ -286,7 +274,7 @@ class _3_2GetItemRequest(_GetItemRequest):
 
         def _finalize(self, **kw):
             if not self.request._ids:
-                if not any((self.params, self.request._sliced)):
+                if not self.params:
                     raise BiteError('no supported options specified')
 
                 # return all non-closed issues by default
@@ -447,20 +435,32 @@ class _BaseSearchRequest(RESTParseRequest, RedminePagedRequest):
         self._itemreq = self.service.GetItemRequest(searchreq=True, **self.unused_params)
         self.options.extend(self._itemreq.options)
 
-    def send(self):
+    def send(self, **kw):
         # only send search req if it actually has query params
-        if self.params:
-            issues = list(super().send())
-        else:
-            issues = []
-
-        # query and pull additional issue fields not available via search
-        if issues or self._itemreq.params:
-            if issues:
-                self._itemreq_extra_params['ids'] = issues
-            self._itemreq.parse_params(**self._itemreq_extra_params)
-            issues = self._itemreq.send()
-        yield from issues
+        if not self.params:
+            if self._itemreq.params:
+                self._itemreq.parse_params(**self._itemreq_extra_params)
+                yield from self._itemreq.send(**kw)
+            return
+
+        # Query and pull additional issue fields not available via search for
+        # each page of search results as it arrives, keeping the next item
+        # request in flight while the previous one is consumed.
+        ids = super().send(**kw)
+        size = self.service.max_results
+        pending = deque()
+        for batch in iter(lambda: list(islice(ids, size)), []):
+            pending.append(self.service.send([self._item_request(batch)], **kw))
+            while len(pending) > 1:
+                yield from next(pending.popleft())
+        while pending:
+            yield from next(pending.popleft())
+
+    def _item_request(self, ids):
+        """Create a request pulling the issue fields for a batch of search results."""
+        req = self.service.GetItemRequest(searchreq=True, **self.unused_params)
+        req.parse_params(ids=ids, **self._itemreq_extra_params)
+        return req
 
     def parse(self, data):
         # parse the search query results if a query exists
@@ -240,6 +240,9 @@ class Roundup(Xmlrpc):
 class _SearchRequest(ParseRequest, RPCRequest):
     """Construct a search request."""
 
+    _memoize = True
+    _retry = True
+
     # map from standardized kwargs name to expected service parameter name
     _params_map = {
         'created': 'creation',
@@ -347,6 +350,10 @@ class _SearchRequest(ParseRequest, RPCRequest):
 class _GetItemRequest(Multicall):
     """Construct an item request."""
 
+    _memoize = True
+    _retry = True
+    _stream = ()
+
     def __init__(self, *, ids, fields=None, **kw):
         super().__init__(command='display', **kw)
         if ids is None:
@@ -419,6 +426,9 @@ class _GetRequest(_GetItemRequest):
 class _AttachmentsRequest(Multicall):
     """Construct an attachments request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, ids=None, attachment_ids=None, get_data=False, **kw):
         # TODO: add support for specifying issue IDs
         if attachment_ids is None:
@@ -452,6 +462,9 @@ class _AttachmentsRequest(Multicall):
 class _CommentsRequest(BaseCommentsRequest, Multicall):
     """Construct a comments request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, comment_ids=None, fields=(), **kw):
         super().__init__(command='display', **kw)
 
@@ -504,5 +517,8 @@ class _CommentsRequest(BaseCommentsRequest, Multicall):
 class _SchemaRequest(RPCRequest):
     """Construct a schema request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='schema', **kw)
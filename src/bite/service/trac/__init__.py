@@ -272,6 +272,9 @@ class BaseSearchRequest(ParseRequest):
 @req_cmd(Trac, cmd='search')
 class _SearchRequest(BaseSearchRequest, RPCRequest):
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='ticket.query', **kw)
 
@@ -291,6 +294,10 @@ class _SearchRequest(BaseSearchRequest, RPCRequest):
 class _GetItemRequest(Multicall):
     """Construct an item request."""
 
+    _memoize = True
+    _retry = True
+    _stream = ()
+
     def __init__(self, ids, **kw):
         super().__init__(command='ticket.get', params=ids, **kw)
         if ids is None:
@@ -311,6 +318,9 @@ class _GetItemRequest(Multicall):
 class _ChangelogRequest(Multicall):
     """Construct a changelog request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, ids=None, item_id=False, data=None, **kw):
         if data is None:
             super().__init__(command='ticket.changeLog', params=ids, **kw)
@@ -351,6 +361,9 @@ class _CommentsRequest(BaseCommentsRequest, _ChangelogRequest):
 class _AttachmentsRequest(Multicall):
     """Construct an attachments request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, ids, **kw):
         super().__init__(command='ticket.listAttachments', params=ids, **kw)
         if ids is None:
@@ -448,6 +461,9 @@ class _GetRequest(MergedMulticall):
 class _VersionRequest(RPCRequest):
     """Construct a version request."""
 
+    _memoize = True
+    _retry = True
+
     def __init__(self, **kw):
         super().__init__(command='system.getAPIVersion', **kw)
 
@@ -21,6 +21,8 @@ def as_datetime(dct):
 class TracJsonrpc(Trac, Jsonrpc):
 
     _service = 'trac-jsonrpc'
+    # datetime objects require decoding hooks unsupported by incremental parsing
+    _streaming = False
 
     def parse_response(self, response):
         return super().parse_response(response, object_hook=as_datetime)
@@ -0,0 +1,263 @@
+"""Local SQLite storage for item data synced from a service."""
+
+from contextlib import contextmanager
+from datetime import date, datetime
+import json
+import os
+import sqlite3
+
+from snakeoil.demandload import demandload
+
+from .exceptions import BiteError
+
+demandload('bite:const')
+
+
+def _encode(obj):
+    """Encode dates as tagged ISO 8601 strings so they can be restored."""
+    if isinstance(obj, datetime):
+        return {'__datetime__': obj.isoformat()}
+    elif isinstance(obj, date):
+        return {'__date__': obj.isoformat()}
+    # other date wrappers such as bite.objects.DateTime
+    elif hasattr(obj, 'isoformat'):
+        return {'__datetime__': obj.isoformat()}
+    return str(obj)
+
+
+def _decode(obj):
+    """Restore dates encoded by _encode()."""
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        elif '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+    return obj
+
+
+def _dumps(obj):
+    """Serialize data to JSON, converting unknown objects to strings."""
+    return json.dumps(obj, default=_encode)
+
+
+def _loads(data):
+    """Deserialize JSON data from _dumps()."""
+    return json.loads(data, object_hook=_decode)
+
+
+def _isoformat(date):
+    return date.isoformat() if date is not None else None
+
+
+class ItemStore(object):
+    """Local store of items and their comments, changes, and attachment metadata.
+
+    Items queued for syncing are tracked in a pending table that is updated in
+    the same transaction as the synced data, allowing interrupted syncs to be
+    resumed where they left off.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS items (
+            id NOT NULL PRIMARY KEY,
+            modified TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS comments (
+            item_id NOT NULL,
+            count INTEGER NOT NULL,
+            creator TEXT,
+            created TEXT,
+            text TEXT,
+            PRIMARY KEY (item_id, count)
+        );
+        CREATE TABLE IF NOT EXISTS changes (
+            item_id NOT NULL,
+            count INTEGER NOT NULL,
+            creator TEXT,
+            created TEXT,
+            changes TEXT,
+            PRIMARY KEY (item_id, count)
+        );
+        CREATE TABLE IF NOT EXISTS attachments (
+            id NOT NULL PRIMARY KEY,
+            item_id NOT NULL,
+            filename TEXT,
+            size INTEGER,
+            mimetype TEXT,
+            creator TEXT,
+            created TEXT,
+            modified TEXT
+        );
+        CREATE INDEX IF NOT EXISTS attachments_item_id ON attachments (item_id);
+        CREATE TABLE IF NOT EXISTS pending (
+            id NOT NULL PRIMARY KEY,
+            modified TEXT
+        );
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT NOT NULL PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # full-text index of comment text, kept up to date via triggers
+    _fts_schema = (
+        'CREATE VIRTUAL TABLE comments_fts USING fts5(text, item_id UNINDEXED, count UNINDEXED)',
+        """CREATE TRIGGER comments_fts_insert AFTER INSERT ON comments BEGIN
+            INSERT INTO comments_fts (text, item_id, count)
+            VALUES (new.text, new.item_id, new.count);
+        END""",
+        """CREATE TRIGGER comments_fts_delete AFTER DELETE ON comments BEGIN
+            DELETE FROM comments_fts WHERE item_id = old.item_id AND count = old.count;
+        END""",
+        # index comments stored before the index existed
+        'INSERT INTO comments_fts (text, item_id, count) SELECT text, item_id, count FROM comments',
+    )
+
+    # item attributes that aren't stored with the item data
+    _skip_attrs = frozenset(('service', 'comments', 'attachments', 'changes', 'history'))
+
+    def __init__(self, connection=None, path=None):
+        if path is None:
+            if connection is None:
+                raise BiteError('item store requires a configured connection')
+            path = os.path.join(const.USER_DATA_PATH, 'store', f'{connection}.db')
+        self.path = path
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript(self._schema)
+            self.fts = self._init_fts()
+        except (IOError, sqlite3.Error) as e:
+            raise BiteError(f'failed opening item store: {self.path!r}: {e}')
+
+    def _init_fts(self):
+        """Create the comment text index if supported, returning its availability."""
+        row = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'comments_fts'").fetchone()
+        if row is None:
+            try:
+                with self.transaction() as db:
+                    for statement in self._fts_schema:
+                        db.execute(statement)
+            except sqlite3.OperationalError as e:
+                # sqlite built without FTS5 support
+                if 'fts5' in str(e):
+                    return False
+                raise
+        return True
+
+    def close(self):
+        self._db.close()
+
+    @contextmanager
+    def transaction(self):
+        """Context manager committing all changes at once or none on failure."""
+        with self._db:
+            yield self._db
+
+    def __getitem__(self, key):
+        row = self._db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        with self.transaction() as db:
+            db.execute('INSERT OR REPLACE INTO state VALUES (?, ?)', (key, value))
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def queue(self, items):
+        """Queue outdated items to be synced from (ID, modified time) tuples.
+
+        Returns the number of newly queued items.
+        """
+        queued = 0
+        with self.transaction() as db:
+            for id, modified in items:
+                modified = _isoformat(modified)
+                row = db.execute('SELECT modified FROM items WHERE id = ?', (id,)).fetchone()
+                if row is not None and row[0] == modified:
+                    continue
+                db.execute('INSERT OR REPLACE INTO pending VALUES (?, ?)', (id, modified))
+                queued += 1
+        return queued
+
+    @property
+    def pending(self):
+        """List of item IDs queued to be synced."""
+        return [row[0] for row in self._db.execute('SELECT id FROM pending ORDER BY id')]
+
+    def update(self, items):
+        """Store items with all their related data in a single transaction."""
+        with self.transaction() as db:
+            for item in items:
+                data = {k: v for k, v in vars(item).items() if k not in self._skip_attrs}
+                db.execute(
+                    'INSERT OR REPLACE INTO items VALUES (?, ?, ?)',
+                    (item.id, _isoformat(item.modified), _dumps(data)))
+
+                # comments are only ever appended so just add newly created ones
+                latest = db.execute(
+                    'SELECT MAX(created) FROM comments WHERE item_id = ?', (item.id,)).fetchone()[0]
+                db.executemany(
+                    'INSERT OR IGNORE INTO comments VALUES (?, ?, ?, ?, ?)',
+                    ((item.id, c.count, c.creator, _isoformat(c.created), c.text)
+                     for c in (item.comments or ())
+                     if latest is None or _isoformat(c.created) >= latest))
+
+                db.execute('DELETE FROM changes WHERE item_id = ?', (item.id,))
+                db.executemany(
+                    'INSERT INTO changes VALUES (?, ?, ?, ?, ?)',
+                    ((item.id, c.count, c.creator, _isoformat(c.created), _dumps(c.changes))
+                     for c in (item.changes or ())))
+
+                db.execute('DELETE FROM attachments WHERE item_id = ?', (item.id,))
+                db.executemany(
+                    'INSERT OR REPLACE INTO attachments VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    ((a.id, item.id, a.filename, a.size, a.mimetype, a.creator,
+                      _isoformat(a.created), _isoformat(a.modified))
+                     for a in (item.attachments or ())))
+
+                db.execute('DELETE FROM pending WHERE id = ?', (item.id,))
+
+    def items(self):
+        """Iterate over stored items as dicts of their data."""
+        for (data,) in self._db.execute('SELECT data FROM items ORDER BY id'):
+            yield _loads(data)
+
+    def search(self, text, limit=None):
+        """Iterate over the data of items with comments matching a full-text query.
+
+        Items are ordered by relevance of their best matching comment.
+        """
+        if not self.fts:
+            raise BiteError('full-text search requires SQLite with FTS5 support')
+
+        query = """
+            SELECT items.data FROM (
+                SELECT item_id, MIN(rank) AS rank FROM comments_fts
+                WHERE comments_fts MATCH ? GROUP BY item_id
+            ) AS matches JOIN items ON items.id = matches.item_id
+            ORDER BY matches.rank LIMIT ?
+        """
+        try:
+            rows = self._db.execute(query, (text, limit if limit is not None else -1)).fetchall()
+        except sqlite3.OperationalError as e:
+            raise BiteError(f'invalid search query: {text!r}: {e}')
+        for (data,) in rows:
+            yield _loads(data)
+
+    @property
+    def modified(self):
+        """Latest modification time of all stored items."""
+        return self._db.execute('SELECT MAX(modified) FROM items').fetchone()[0]
@@ -1,10 +1,13 @@
 from functools import partial
 from unittest.mock import patch
 
+import pytest
 from pytest import raises
 
 from bite import __title__ as project
+from bite.args import ServiceOpts
 from bite.scripts import run
+from bite.scripts.bite import argparser
 
 
 def test_script_run(capfd):
@@ -45,3 +48,17 @@ def test_script_run(capfd):
         assert excinfo.value.code == 2
         out, err = capfd.readouterr()
         assert err.startswith("{}: error: ".format(project))
+
+
+@pytest.mark.parametrize('opt, value, expected', (
+    ('adaptive', 'true', True),
+    ('http_cache', 'true', True),
+    ('http_cache', 'false', False),
+    ('stream', 'true', True),
+    ('json_codec', 'orjson', 'orjson'),
+))
+def test_config_opts(opt, value, expected):
+    """Connection config settings apply unless overridden on the command line."""
+    args, _ = argparser.parse_optionals([])
+    ServiceOpts(argparser, 'service').add_config_opts(args, {opt: value})
+    assert getattr(args, opt) == expected
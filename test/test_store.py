@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from bite import const
+from bite.client.bugzilla import Bugzilla
+from bite.exceptions import BiteError
+from bite.objects import Item, Comment
+from bite.store import ItemStore
+
+
+def _item(id, modified, comments=()):
+    item = Item()
+    item.id = id
+    item.modified = datetime(2020, 1, modified, tzinfo=timezone.utc)
+    item.comments = [
+        Comment(id=id, count=i, creator='user', created=item.modified, text=text)
+        for i, text in enumerate(comments)]
+    item.attachments = []
+    item.changes = []
+    return item
+
+
+class TestItemStore(object):
+
+    def test_sync(self, tmp_path):
+        store = ItemStore(path=str(tmp_path / 'store.db'))
+        items = [_item(1, 1, ['foo']), _item(2, 2, ['bar', 'baz'])]
+        assert store.queue((x.id, x.modified) for x in items) == 2
+        assert store.pending == [1, 2]
+
+        # an interrupted sync leaves the remaining items pending
+        store.update(items[:1])
+        assert store.pending == [2]
+        store.close()
+
+        store = ItemStore(path=str(tmp_path / 'store.db'))
+        assert store.pending == [2]
+        store.update(items[1:])
+        assert store.pending == []
+        assert len(store) == 2
+        assert store.modified == items[1].modified.isoformat()
+
+        # unchanged items aren't queued again
+        assert store.queue([(1, items[0].modified), (2, _item(2, 3).modified)]) == 1
+        assert store.pending == [2]
+
+    def test_dates(self, tmp_path):
+        store = ItemStore(path=str(tmp_path / 'store.db'))
+        item = _item(1, 1, ['foo'])
+        item.deadline = item.modified.date()
+        store.update([item])
+        data = next(store.items())
+        assert data['modified'] == item.modified
+        assert data['deadline'] == item.deadline
+        assert next(store.search('foo'))['modified'] == item.modified
+
+    def test_state(self, tmp_path):
+        store = ItemStore(path=str(tmp_path / 'store.db'))
+        assert store.get('modified') is None
+        store['modified'] = 'foo'
+        assert store['modified'] == 'foo'
+
+    def test_search(self, tmp_path):
+        store = ItemStore(path=str(tmp_path / 'store.db'))
+        store.update([
+            _item(1, 1, ['segfault on startup']),
+            _item(2, 2, ['crash', 'segfault segfault in parser']),
+            _item(3, 3, ['unrelated']),
+        ])
+        assert [x['id'] for x in store.search('segfault')] == [2, 1]
+        assert [x['id'] for x in store.search('segfault', limit=1)] == [2]
+        assert list(store.search('missing')) == []
+
+        # only newly created comments are added to the index
+        store.update([_item(3, 4, ['unrelated', 'another segfault'])])
+        assert sorted(x['id'] for x in store.search('segfault')) == [1, 2, 3]
+        assert [x['id'] for x in store.search('unrelated')] == [3]
+
+
+class TestOfflineSearch(object):
+
+    def test_unsupported_opts(self):
+        client = Bugzilla.__new__(Bugzilla)
+        with pytest.raises(BiteError, match='option: status'):
+            client.search(offline=True, terms=['foo'], status=['NEW'], fields=['id'])
+        with pytest.raises(BiteError, match='require --offline'):
+            client.search(text='foo')
+
+
+class TestSync(object):
+
+    def test_marker(self, tmp_path, monkeypatch):
+        try:
+            monkeypatch.setattr(const, 'USER_DATA_PATH', str(tmp_path))
+        except Exception as e:
+            pytest.skip(f'failed loading constants: {e}')
+
+        bugs = {x.id: x for x in (_item(1, 1), _item(2, 2), _item(3, 3))}
+
+        class Req(object):
+            options = []
+
+            def __init__(self, data):
+                self.data = data
+
+            def send(self):
+                return iter(self.data)
+
+        class Service(object):
+            connection = 'test'
+
+            # bug 3 is never returned, e.g. it was made private
+            def SearchRequest(self, params):
+                return Req(bugs.values())
+
+            def GetRequest(self, ids, **kw):
+                return Req(bugs[x] for x in ids if x != 3)
+
+        client = Bugzilla.__new__(Bugzilla)
+        client.service = Service()
+        client.quiet = True
+        client.sync(since=bugs[1].modified)
+
+        store = ItemStore('test')
+        assert store.pending == [3]
+        # the sync time isn't moved past bugs that are still pending
+        assert store.get('modified') is None